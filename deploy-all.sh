@@ -13,16 +13,38 @@ echo "✅ SEMANTIC_API = $SEMANTIC_API"
 
 ### === STEP 2: Inject API URLs into Lambda files ===
 echo "✍️ Injecting into Lambda files..."
-sed -i '' "s|^EMBEDDING_API = .*|EMBEDDING_API = \"$EMBEDDING_API\"|" trackwise-backend/manual_entry_lambda.py
-sed -i '' "s|^EMBEDDING_API = .*|EMBEDDING_API = \"$EMBEDDING_API\"|" trackwise-backend/textract_parser_lambda.py
+sed -i '' "s|^EMBEDDING_API = .*|EMBEDDING_API = \"$EMBEDDING_API\"|" trackwise-backend/records_stream_lambda.py
 sed -i '' "s|^PERSONAL_API_URL = .*|PERSONAL_API_URL = \"$SEMANTIC_API\"|" trackwise-backend/chatbot_query_handler.py
 
 ### === STEP 3: Zip updated Lambda files ===
 echo "📦 Zipping Lambda files..."
 cd trackwise-backend
-zip -r manual_entry_lambda.zip manual_entry_lambda.py
-zip -r textract_parser_lambda.zip textract_parser_lambda.py
-zip -r chatbot_query_handler.zip chatbot_query_handler.py
+zip -r manual_entry_lambda.zip manual_entry_lambda.py runtime.py idempotency.py record_store.py rollups.py record_version.py serialization.py
+zip -r textract_parser_lambda.zip textract_parser_lambda.py s3_events.py bill_index.py bill_text.py bill_images.py textract_expense.py runtime.py record_store.py rollups.py record_version.py
+# pypdf is pure Python and ships in the parser zip; Pillow has native wheels,
+# so it goes in a layer built for the Lambda runtime (python3.11, x86_64)
+rm -rf build && mkdir -p build/pypdf build/pillow_layer/python
+pip install pypdf --target build/pypdf --quiet
+pip install pillow --target build/pillow_layer/python --quiet \
+  --platform manylinux2014_x86_64 --implementation cp --python-version 3.11 --only-binary=:all:
+(cd build/pypdf && zip -r ../../textract_parser_lambda.zip .)
+rm -f pillow_layer.zip
+(cd build/pillow_layer && zip -r ../../pillow_layer.zip python)
+rm -rf build
+zip -r textract_result_lambda.zip textract_result_lambda.py textract_expense.py bill_index.py runtime.py record_store.py rollups.py record_version.py
+zip -r statement_import_lambda.zip statement_import_lambda.py statement_parsers.py s3_events.py runtime.py idempotency.py record_store.py rollups.py record_version.py
+zip -r records_stream_lambda.zip records_stream_lambda.py runtime.py http_client.py serialization.py record_version.py requests urllib3 certifi charset_normalizer idna
+zip -r chatbot_query_handler.zip chatbot_query_handler.py runtime.py http_client.py requests urllib3 certifi charset_normalizer idna
+zip -r get_transactions_lambda.zip get_transactions_lambda.py runtime.py parallel_scan.py record_version.py serialization.py
+# brotli has native wheels too; built for the Lambda runtime like Pillow
+rm -rf build && mkdir -p build/brotli
+pip install brotli --target build/brotli --quiet \
+  --platform manylinux2014_x86_64 --implementation cp --python-version 3.11 --only-binary=:all:
+(cd build/brotli && zip -r ../../get_transactions_lambda.zip .)
+rm -rf build
+zip -r export_transactions_lambda.zip export_transactions_lambda.py runtime.py parallel_scan.py serialization.py
+zip -r get_summary_lambda.zip get_summary_lambda.py runtime.py rollups.py serialization.py
+zip -r get_presigned_url.zip get_presigned_url.py runtime.py
 cd ..
 
 ### === STEP 4: Set Learner Lab AWS credentials ===
@@ -3,13 +3,109 @@ resource "aws_dynamodb_table" "trackwise_records" {
   billing_mode   = "PAY_PER_REQUEST"
   hash_key       = "id"
 
+  # Feeds records_stream_lambda, which keeps OpenSearch in sync with every write path
+  stream_enabled   = true
+  stream_view_type = "NEW_AND_OLD_IMAGES"
+
   attribute {
     name = "id"
     type = "S"
   }
 
+  attribute {
+    name = "type"
+    type = "S"
+  }
+
+  attribute {
+    name = "category"
+    type = "S"
+  }
+
+  attribute {
+    name = "date"
+    type = "S"
+  }
+
+  # Date-sorted lookups used by the get-transactions query mode
+  global_secondary_index {
+    name            = "type-date-index"
+    hash_key        = "type"
+    range_key       = "date"
+    projection_type = "ALL"
+  }
+
+  global_secondary_index {
+    name            = "category-date-index"
+    hash_key        = "category"
+    range_key       = "date"
+    projection_type = "ALL"
+  }
+
   tags = {
     Name        = "TrackWiseRecords"
     Environment = "Dev"
   }
 }
+
+# Month x type x category totals maintained by the writers with ADD updates
+resource "aws_dynamodb_table" "trackwise_rollups" {
+  name           = "TrackWiseRollups"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "month"
+  range_key      = "bucket"
+
+  attribute {
+    name = "month"
+    type = "S"
+  }
+
+  attribute {
+    name = "bucket"
+    type = "S"
+  }
+
+  tags = {
+    Name        = "TrackWiseRollups"
+    Environment = "Dev"
+  }
+}
+
+# Small bookkeeping items, e.g. the records write-version used for ETags
+resource "aws_dynamodb_table" "trackwise_meta" {
+  name           = "TrackWiseMeta"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "name"
+
+  attribute {
+    name = "name"
+    type = "S"
+  }
+
+  tags = {
+    Name        = "TrackWiseMeta"
+    Environment = "Dev"
+  }
+}
+
+# Idempotency-Key claims and stored responses; expired keys are removed by TTL
+resource "aws_dynamodb_table" "trackwise_idempotency" {
+  name           = "TrackWiseIdempotency"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "request_key"
+
+  attribute {
+    name = "request_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Name        = "TrackWiseIdempotency"
+    Environment = "Dev"
+  }
+}
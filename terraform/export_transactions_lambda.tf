@@ -0,0 +1,85 @@
+resource "aws_s3_bucket" "exports" {
+  bucket        = "trackwise-exports"
+  force_destroy = true
+}
+
+resource "aws_s3_bucket_public_access_block" "exports" {
+  bucket = aws_s3_bucket.exports.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+# Exports are only fetched once through the presigned URL
+resource "aws_s3_bucket_lifecycle_configuration" "exports" {
+  bucket = aws_s3_bucket.exports.id
+
+  rule {
+    id     = "expire-exports"
+    status = "Enabled"
+
+    filter {}
+
+    expiration {
+      days = 1
+    }
+
+    abort_incomplete_multipart_upload {
+      days_after_initiation = 1
+    }
+  }
+}
+
+resource "aws_lambda_function" "export_transactions" {
+  function_name = "trackwise-export-transactions"
+  handler       = "export_transactions_lambda.lambda_handler"
+  runtime       = "python3.11"
+  role          = "arn:aws:iam::570322492335:role/LabRole"
+
+  filename         = "${path.module}/../trackwise-backend/export_transactions_lambda.zip"
+  source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/export_transactions_lambda.zip")
+  timeout          = 900 # the export itself runs on an async self-invoke
+  memory_size      = 512
+
+  environment {
+    variables = {
+      SCAN_SEGMENTS = "4"
+    }
+  }
+}
+
+resource "aws_apigatewayv2_integration" "export_transactions" {
+  api_id                 = aws_apigatewayv2_api.http_api.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = aws_lambda_function.export_transactions.invoke_arn
+  integration_method     = "POST"
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "export_transactions" {
+  api_id    = aws_apigatewayv2_api.http_api.id
+  route_key = "POST /export-transactions"
+  target    = "integrations/${aws_apigatewayv2_integration.export_transactions.id}"
+}
+
+resource "aws_apigatewayv2_route" "export_transactions_status" {
+  api_id    = aws_apigatewayv2_api.http_api.id
+  route_key = "GET /export-transactions/{job_id}"
+  target    = "integrations/${aws_apigatewayv2_integration.export_transactions.id}"
+}
+
+# A failed export is reported as FAILED to the polling client, not retried
+resource "aws_lambda_function_event_invoke_config" "export_transactions" {
+  function_name          = aws_lambda_function.export_transactions.function_name
+  maximum_retry_attempts = 0
+}
+
+resource "aws_lambda_permission" "export_transactions" {
+  statement_id  = "AllowExportTransactionsInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.export_transactions.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.http_api.execution_arn}/*/*"
+}
@@ -0,0 +1,32 @@
+resource "aws_lambda_function" "get_summary" {
+  function_name = "trackwise-get-summary"
+  handler       = "get_summary_lambda.lambda_handler"
+  runtime       = "python3.11"
+  role          = "arn:aws:iam::570322492335:role/LabRole"
+
+  filename         = "${path.module}/../trackwise-backend/get_summary_lambda.zip"
+  source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/get_summary_lambda.zip")
+  timeout          = 10
+}
+
+resource "aws_apigatewayv2_integration" "get_summary" {
+  api_id                 = aws_apigatewayv2_api.http_api.id
+  integration_type       = "AWS_PROXY"
+  integration_uri        = aws_lambda_function.get_summary.invoke_arn
+  integration_method     = "POST"
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "get_summary" {
+  api_id    = aws_apigatewayv2_api.http_api.id
+  route_key = "GET /get-summary"
+  target    = "integrations/${aws_apigatewayv2_integration.get_summary.id}"
+}
+
+resource "aws_lambda_permission" "get_summary" {
+  statement_id  = "AllowGetSummaryInvoke"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.get_summary.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.http_api.execution_arn}/*/*"
+}
@@ -7,6 +7,14 @@ resource "aws_lambda_function" "get_transactions" {
   filename         = "${path.module}/../trackwise-backend/get_transactions_lambda.zip"
   source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/get_transactions_lambda.zip")
   timeout          = 10
+
+  environment {
+    variables = {
+      SCAN_SEGMENTS     = "4"
+      CACHE_TTL_SECONDS = "300"
+      CACHE_MAX_ENTRIES = "64"
+    }
+  }
 }
 
 resource "aws_apigatewayv2_integration" "get_transactions" {
@@ -23,6 +31,13 @@ resource "aws_apigatewayv2_route" "get_transactions" {
   target    = "integrations/${aws_apigatewayv2_integration.get_transactions.id}"
 }
 
+resource "aws_apigatewayv2_route" "get_transaction_detail" {
+  api_id    = aws_apigatewayv2_api.http_api.id
+  # Greedy: bill record ids contain '/' (bills/...) and '#<n>' suffixes
+  route_key = "GET /get-transactions/{id+}"
+  target    = "integrations/${aws_apigatewayv2_integration.get_transactions.id}"
+}
+
 resource "aws_lambda_permission" "get_transactions" {
   statement_id  = "AllowGetTransactionsInvoke"
   action        = "lambda:InvokeFunction"
@@ -6,5 +6,60 @@ resource "aws_lambda_function" "textract_parser" {
 
   filename         = "${path.module}/../trackwise-backend/textract_parser_lambda.zip"
   source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/textract_parser_lambda.zip")
-  timeout          = 15
+  timeout          = 60
+  memory_size      = 512 # local PDF text parsing
+  layers           = [aws_lambda_layer_version.pillow.arn]
+
+  environment {
+    variables = {
+      TEXTRACT_TOPIC_ARN = aws_sns_topic.textract_expense.arn
+      TEXTRACT_ROLE_ARN  = "arn:aws:iam::570322492335:role/LabRole"
+    }
+  }
+}
+
+# Pillow for bill image preprocessing, built by deploy-all.sh
+resource "aws_lambda_layer_version" "pillow" {
+  layer_name          = "trackwise-pillow"
+  filename            = "${path.module}/../trackwise-backend/pillow_layer.zip"
+  source_code_hash    = filebase64sha256("${path.module}/../trackwise-backend/pillow_layer.zip")
+  compatible_runtimes = ["python3.11"]
+}
+
+# Textract publishes StartExpenseAnalysis completions here
+resource "aws_sns_topic" "textract_expense" {
+  name = "AmazonTextract-trackwise-expense"
+}
+
+resource "aws_lambda_function" "textract_result" {
+  function_name = "trackwise-textract-result"
+  handler       = "textract_result_lambda.lambda_handler"
+  runtime       = "python3.11"
+  role          = "arn:aws:iam::570322492335:role/LabRole"
+
+  filename         = "${path.module}/../trackwise-backend/textract_result_lambda.zip"
+  source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/textract_result_lambda.zip")
+  timeout          = 60
+}
+
+# Failed completions (throttled GetExpenseAnalysis, record write errors) are
+# retried by Lambda's async invoke
+resource "aws_lambda_function_event_invoke_config" "textract_result" {
+  function_name                = aws_lambda_function.textract_result.function_name
+  maximum_retry_attempts       = 2
+  maximum_event_age_in_seconds = 3600
+}
+
+resource "aws_sns_topic_subscription" "textract_result" {
+  topic_arn = aws_sns_topic.textract_expense.arn
+  protocol  = "lambda"
+  endpoint  = aws_lambda_function.textract_result.arn
+}
+
+resource "aws_lambda_permission" "allow_sns_invoke_textract_result" {
+  statement_id  = "AllowSNSToInvokeTextractResult"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.textract_result.function_name
+  principal     = "sns.amazonaws.com"
+  source_arn    = aws_sns_topic.textract_expense.arn
 }
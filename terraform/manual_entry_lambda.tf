@@ -6,7 +6,7 @@ resource "aws_lambda_function" "manual_entry" {
 
   filename         = "${path.module}/../trackwise-backend/manual_entry_lambda.zip"
   source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/manual_entry_lambda.zip")
-  timeout          = 10
+  timeout          = 30
 }
 
 resource "aws_apigatewayv2_integration" "manual_entry" {
@@ -23,6 +23,12 @@ resource "aws_apigatewayv2_route" "manual_entry" {
   target    = "integrations/${aws_apigatewayv2_integration.manual_entry.id}"
 }
 
+resource "aws_apigatewayv2_route" "manual_entry_batch" {
+  api_id    = aws_apigatewayv2_api.http_api.id
+  route_key = "POST /manual-entry/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.manual_entry.id}"
+}
+
 resource "aws_lambda_permission" "manual_entry" {
   statement_id  = "AllowManualEntryInvoke"
   action        = "lambda:InvokeFunction"
@@ -0,0 +1,38 @@
+resource "aws_lambda_function" "records_stream" {
+  function_name = "trackwise-records-stream"
+  handler       = "records_stream_lambda.lambda_handler"
+  runtime       = "python3.11"
+  role          = "arn:aws:iam::570322492335:role/LabRole"
+
+  filename         = "${path.module}/../trackwise-backend/records_stream_lambda.zip"
+  source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/records_stream_lambda.zip")
+  timeout          = 300
+}
+
+# Per-shard batches; parallelization_factor keeps per-record ordering while
+# letting each shard run several batches at once
+resource "aws_lambda_event_source_mapping" "records_stream" {
+  event_source_arn                   = aws_dynamodb_table.trackwise_records.stream_arn
+  function_name                      = aws_lambda_function.records_stream.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 5
+  parallelization_factor             = 4
+  maximum_retry_attempts             = 10
+  function_response_types            = ["ReportBatchItemFailures"]
+  # A failing batch is split to isolate the records that keep failing; those
+  # that still fail after the retries are sent to the queue instead of dropped
+  bisect_batch_on_function_error = true
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.records_stream_failures.arn
+    }
+  }
+}
+
+# Stream batches that exhausted their retries, for inspection and replay
+resource "aws_sqs_queue" "records_stream_failures" {
+  name                      = "trackwise-records-stream-failures"
+  message_retention_seconds = 1209600
+}
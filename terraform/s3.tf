@@ -24,15 +24,41 @@ resource "aws_s3_bucket_cors_configuration" "bill_uploads_cors" {
   }
 }
 
+# processed/ holds shrunk copies of photo bills that only Textract reads; the
+# original upload under bills/ is kept
+resource "aws_s3_bucket_lifecycle_configuration" "bill_uploads" {
+  bucket = aws_s3_bucket.bill_uploads.id
+
+  rule {
+    id     = "expire-processed-images"
+    status = "Enabled"
+
+    filter {
+      prefix = "processed/"
+    }
+
+    expiration {
+      days = 7
+    }
+  }
+}
+
 resource "aws_s3_bucket_notification" "lambda_trigger" {
   bucket = aws_s3_bucket.bill_uploads.id
 
   lambda_function {
     lambda_function_arn = aws_lambda_function.textract_parser.arn
     events              = ["s3:ObjectCreated:*"]
+    filter_prefix       = "bills/"
+  }
+
+  lambda_function {
+    lambda_function_arn = aws_lambda_function.statement_import.arn
+    events              = ["s3:ObjectCreated:*"]
+    filter_prefix       = "imports/"
   }
 
-  depends_on = [aws_lambda_permission.allow_s3_invoke]
+  depends_on = [aws_lambda_permission.allow_s3_invoke, aws_lambda_permission.allow_s3_invoke_import]
 }
 
 resource "aws_lambda_permission" "allow_s3_invoke" {
@@ -0,0 +1,19 @@
+resource "aws_lambda_function" "statement_import" {
+  function_name = "trackwise-statement-import"
+  handler       = "statement_import_lambda.lambda_handler"
+  runtime       = "python3.11"
+  role          = "arn:aws:iam::570322492335:role/LabRole"
+
+  filename         = "${path.module}/../trackwise-backend/statement_import_lambda.zip"
+  source_code_hash = filebase64sha256("${path.module}/../trackwise-backend/statement_import_lambda.zip")
+  timeout          = 900
+  memory_size      = 1024
+}
+
+resource "aws_lambda_permission" "allow_s3_invoke_import" {
+  statement_id  = "AllowS3ToInvokeStatementImport"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.statement_import.function_name
+  principal     = "s3.amazonaws.com"
+  source_arn    = aws_s3_bucket.bill_uploads.arn
+}
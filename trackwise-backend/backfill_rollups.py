@@ -0,0 +1,39 @@
+import argparse
+from collections import defaultdict
+from decimal import Decimal
+import boto3
+from parallel_scan import parallel_scan
+from rollups import ROLLUP_TABLE, rollup_key
+
+# Rebuilds TrackWiseRollups from a full scan of TrackWiseRecords.
+# Run once after creating the rollup table, with writers paused.
+def rebuild(segments=None):
+    dynamodb = boto3.resource("dynamodb")
+    rollup_table = dynamodb.Table(ROLLUP_TABLE)
+
+    rows = defaultdict(lambda: {"total": Decimal("0"), "record_count": 0})
+    for record in parallel_scan("TrackWiseRecords", segments=segments):
+        key = rollup_key(record)
+        row = rows[(key["month"], key["bucket"])]
+        row["total"] += Decimal(str(record.get("amount", 0)))
+        row["record_count"] += 1
+
+    with rollup_table.batch_writer() as batch:
+        for (month, bucket), row in rows.items():
+            record_type, category = bucket.split("#", 1)
+            batch.put_item(Item={
+                "month": month,
+                "bucket": bucket,
+                "type": record_type,
+                "category": category,
+                "total": row["total"],
+                "record_count": row["record_count"]
+            })
+
+    print(f"Wrote {len(rows)} rollup rows")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int)
+    args = parser.parse_args()
+    rebuild(args.segments)
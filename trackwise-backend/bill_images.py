@@ -0,0 +1,119 @@
+import io
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# Shrinks phone photos of bills before OCR: decode, apply and drop EXIF
+# orientation/metadata, downsample, grayscale, recompress. The original upload
+# is left untouched under bills/; Textract reads the processed copy.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff")
+MIN_BYTES = 1024 * 1024  # smaller uploads go to Textract as they are
+MAX_SIDE = 2200  # long edge in px; keeps receipt text well above OCR's minimum height
+JPEG_QUALITY = 85
+
+def available():
+    return Image is not None
+
+def enabled():
+    return available() and os.environ.get("IMAGE_PREPROCESS", "1") != "0"
+
+def is_image(key):
+    return key.lower().endswith(IMAGE_EXTENSIONS)
+
+# JPEG bytes of the processed image, or None when it would not be smaller
+# or the image has more than one page
+def preprocess(data):
+    try:
+        image = Image.open(io.BytesIO(data))
+        # Multi-page TIFFs would be cut to their first page; Textract reads them as they are
+        if getattr(image, "n_frames", 1) > 1:
+            return None
+        # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding
+        image.draft("L", (MAX_SIDE, MAX_SIDE))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("L")
+        image.thumbnail((MAX_SIDE, MAX_SIDE), Image.LANCZOS)
+        out = io.BytesIO()
+        # Saved without exif=..., so no metadata (GPS, device) is carried over
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    except Exception as e:
+        print("Image preprocessing failed:", str(e))
+        return None
+    processed = out.getvalue()
+    return processed if len(processed) < len(data) else None
+
+# Compares Textract on original vs processed copies of a fixture set:
+#
+#   python bill_images.py fixtures/ --bucket trackwise-bill-uploads
+#
+# fixtures/expected.json maps file name -> {"amount": "12.34", "vendor": "..."};
+# --no-ocr only reports preprocessing time and size.
+if __name__ == "__main__":
+    import json
+    import time
+    import argparse
+    from decimal import Decimal
+    import runtime
+    import textract_expense
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtures")
+    parser.add_argument("--bucket", default="trackwise-bill-uploads")
+    parser.add_argument("--prefix", default="bench/", help="outside the bills/ notification filter")
+    parser.add_argument("--no-ocr", action="store_true")
+    args = parser.parse_args()
+
+    expected_path = os.path.join(args.fixtures, "expected.json")
+    expected = json.load(open(expected_path)) if os.path.exists(expected_path) else {}
+    names = sorted(name for name in os.listdir(args.fixtures) if is_image(name))
+
+    def ocr(name, data):
+        key = f"{args.prefix}{name}"
+        runtime.client("s3").put_object(Bucket=args.bucket, Key=key, Body=data)
+        started = time.perf_counter()
+        response = runtime.client("textract").analyze_expense(
+            Document={"S3Object": {"Bucket": args.bucket, "Name": key}}
+        )
+        elapsed = time.perf_counter() - started
+        runtime.client("s3").delete_object(Bucket=args.bucket, Key=key)
+        documents = response.get("ExpenseDocuments") or [{}]
+        return elapsed, textract_expense.build_record(name, documents[0])
+
+    def correct(record, want):
+        amount = want.get("amount") is None or record["amount"] == Decimal(want["amount"])
+        vendor = want.get("vendor") is None or want["vendor"].lower() in record["vendor"].lower()
+        return amount, vendor
+
+    stats = {variant: {"bytes": 0, "seconds": 0.0, "amount": 0, "vendor": 0} for variant in ("original", "processed")}
+    prep_seconds = 0.0
+    for name in names:
+        with open(os.path.join(args.fixtures, name), "rb") as f:
+            original = f.read()
+        started = time.perf_counter()
+        processed = preprocess(original) or original
+        prep_seconds += time.perf_counter() - started
+
+        for variant, data in (("original", original), ("processed", processed)):
+            stats[variant]["bytes"] += len(data)
+            if args.no_ocr:
+                continue
+            elapsed, record = ocr(f"{variant}/{name}", data)
+            amount_ok, vendor_ok = correct(record, expected.get(name, {}))
+            stats[variant]["seconds"] += elapsed
+            stats[variant]["amount"] += amount_ok
+            stats[variant]["vendor"] += vendor_ok
+            print(json.dumps({"file": name, "variant": variant, "bytes": len(data), "seconds": round(elapsed, 2),
+                              "amount": str(record["amount"]), "vendor": record["vendor"]}))
+
+    count = max(1, len(names))
+    print(f"{len(names)} images, preprocessing {prep_seconds / count * 1000:.0f}ms per image")
+    for variant, totals in stats.items():
+        line = f"{variant:>9}: {totals['bytes'] / count / 1024:.0f}KB avg"
+        if not args.no_ocr:
+            line += (f", OCR {totals['seconds'] / count:.2f}s avg"
+                     f", amount {totals['amount']}/{len(names)}, vendor {totals['vendor']}/{len(names)}")
+        print(line)
@@ -0,0 +1,68 @@
+import hashlib
+from botocore.exceptions import ClientError
+import runtime
+
+# Content hash -> record id for uploaded bills, kept in TrackWiseMeta. The
+# first upload of a file claims its hash; later uploads of the same bytes are
+# linked to that record instead of being sent to Textract again.
+
+META_TABLE = "TrackWiseMeta"
+READ_CHUNK = 1024 * 1024
+
+# A single-part upload's ETag is the MD5 of its bytes, so no download is
+# needed; multipart (ETag "...-N") and KMS-encrypted objects are hashed
+def content_hash(bucket, key):
+    s3 = runtime.client("s3")
+    head = s3.head_object(Bucket=bucket, Key=key)
+    etag = head["ETag"].strip('"')
+    if "-" not in etag and head.get("ServerSideEncryption") != "aws:kms":
+        return f"md5:{etag}"
+
+    digest = hashlib.sha256()
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    for chunk in iter(lambda: body.read(READ_CHUNK), b""):
+        digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+def index_key(content):
+    return {"name": f"bill#{content}"}
+
+# Returns the record id that owns this content; that is `document` itself
+# when this upload is the first one (or a redelivery of it)
+def claim(content, document):
+    table = runtime.table(META_TABLE)
+    try:
+        # SET rather than a put, so re-claims keep the uploads linked meanwhile
+        table.update_item(
+            Key=index_key(content),
+            UpdateExpression="SET record_id = :document",
+            ConditionExpression="attribute_not_exists(#name) OR record_id = :document",
+            ExpressionAttributeNames={"#name": "name"},
+            ExpressionAttributeValues={":document": document}
+        )
+        return document
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+    owner = table.get_item(Key=index_key(content), ConsistentRead=True).get("Item")
+    if owner is None:  # forgotten in between; take it over
+        return claim(content, document)
+    table.update_item(
+        Key=index_key(content),
+        UpdateExpression="ADD uploads :upload",
+        ExpressionAttributeValues={":upload": {document}}
+    )
+    return owner["record_id"]
+
+# Called when OCR fails, so the next upload of the same file is retried
+def forget(content, document):
+    try:
+        runtime.table(META_TABLE).delete_item(
+            Key=index_key(content),
+            ConditionExpression="record_id = :document",
+            ExpressionAttributeValues={":document": document}
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
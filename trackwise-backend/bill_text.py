@@ -0,0 +1,127 @@
+import io
+import os
+import re
+from decimal import Decimal
+from datetime import datetime
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# Fast path for born-digital PDF bills: read the embedded text layer and
+# parse vendor, total and line items with a few rules. Scanned PDFs (no text
+# layer) and anything the rules are not sure about go to Textract instead.
+
+MAX_PDF_BYTES = 10 * 1024 * 1024
+MAX_PAGES = 20
+MIN_TEXT_CHARS = 40  # per page; scanned pages come back empty or near-empty
+# Default needs every signal: labelled total, reconciled line items and a vendor
+MIN_CONFIDENCE = float(os.environ.get("TEXT_LAYER_MIN_CONFIDENCE", "1.0"))
+
+MONEY = r"\$?\s*(-?[\d,]+\.\d{2})"
+# Checked in order; the first label found is the bill total
+TOTAL_LABELS = ("grand total", "total due", "amount due", "balance due", "total amount", "total")
+SUBTOTAL_LABELS = ("subtotal", "sub total", "sub-total")
+# Summary lines that are never line items
+SKIP_WORDS = ("total", "tax", "vat", "gst", "tip", "change", "cash", "card", "balance", "due", "discount", "payment", "visa", "mastercard")
+LINE_ITEM = re.compile(r"^(?P<item>.*[A-Za-z].*?)\s+(?:\d+\s*[x@]\s*)?" + MONEY + r"$")
+NON_VENDOR = re.compile(r"invoice|receipt|bill|statement|page \d|tel|phone|www\.|@|\d{3}", re.IGNORECASE)
+
+def available():
+    return PdfReader is not None
+
+def is_pdf(key):
+    return key.lower().endswith(".pdf")
+
+# Text of every page, or None when the PDF has no usable text layer
+def extract_text(data):
+    if PdfReader is None or len(data) > MAX_PDF_BYTES:
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        if reader.is_encrypted or len(reader.pages) > MAX_PAGES:
+            return None
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        print("Text layer extraction failed:", str(e))
+        return None
+    if any(len(page.strip()) < MIN_TEXT_CHARS for page in pages):
+        return None
+    return "\n".join(pages)
+
+def money(value):
+    return Decimal(value.replace(",", ""))
+
+def labelled_amount(lines, labels):
+    for label in labels:
+        pattern = re.compile(rf"\b{re.escape(label)}\b[^\d$-]*{MONEY}", re.IGNORECASE)
+        for line in reversed(lines):  # totals sit at the bottom; later ones win
+            match = pattern.search(line)
+            if match:
+                return money(match.group(1))
+    return None
+
+# Returns (fields, confidence). Confidence adds up from an explicit total
+# label, line items that reconcile with the subtotal or total, and a vendor.
+def parse_text(text):
+    lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+
+    total = labelled_amount(lines, TOTAL_LABELS)
+    subtotal = labelled_amount(lines, SUBTOTAL_LABELS)
+    # Header lines only: anything carrying an amount is an item or a total
+    vendor = next((
+        line for line in lines[:5]
+        if not NON_VENDOR.search(line) and not re.search(MONEY, line) and re.search(r"[A-Za-z]{3}", line)
+    ), "")
+
+    line_items = []
+    for line in lines:
+        match = LINE_ITEM.match(line)
+        if match and not any(word in line.lower() for word in SKIP_WORDS):
+            line_items.append({"item": match.group("item").strip(" .:-"), "amount": money(match.group(2))})
+
+    items_total = sum((item["amount"] for item in line_items), Decimal("0"))
+    confidence = 0.0
+    if total is not None:
+        confidence += 0.6
+    if line_items and (items_total == subtotal or items_total == total):
+        confidence += 0.3
+    if vendor:
+        confidence += 0.1
+
+    fields = {
+        "vendor": vendor,
+        "amount": total if total is not None else Decimal("0"),
+        "line_items": line_items
+    }
+    return fields, round(confidence, 2)
+
+# Same item shape textract_expense.build_record produces
+def build_record(record_id, fields):
+    return {
+        "id": record_id,
+        "type": "expense",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "amount": fields["amount"],
+        "category": "AutoParsed",
+        "description": fields["vendor"] or "Bill",
+        "vendor": fields["vendor"],
+        "line_items": [
+            {"item": item["item"], "amount": item["amount"], "category": "Uncategorized"}
+            for item in fields["line_items"]
+        ],
+        "source": "pdf-text"
+    }
+
+# A record when the text layer parses with enough confidence, otherwise None
+def parse_pdf(record_id, data):
+    text = extract_text(data)
+    if text is None:
+        return None
+    fields, confidence = parse_text(text)
+    print("Text layer parse:", record_id, "confidence", confidence)
+    if confidence < MIN_CONFIDENCE:
+        return None
+    return build_record(record_id, fields)
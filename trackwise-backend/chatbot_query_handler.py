@@ -1,9 +1,16 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import requests
 import os
+import http_client
+
+runtime.init_complete()
 
 PERSONAL_API_URL = os.environ["PERSONAL_API_URL"]
 AUTH_TOKEN = os.environ["AUTH_TOKEN"]
+# connect, read: one attempt has to finish inside the function's 20 s timeout
+# (terraform/chatbot_query_lambda.tf), so there is no budget for a retry
+REQUEST_TIMEOUT = (3.05, 8)
 
 def lambda_handler(event, context):
     try:
@@ -25,7 +32,9 @@ def lambda_handler(event, context):
             "Content-Type": "application/json"
         }
 
-        response = requests.post(PERSONAL_API_URL, json=payload, headers=headers)
+        semantic_search = http_client.client("semantic-search", timeout=REQUEST_TIMEOUT, retries=0)
+        response = semantic_search.post(PERSONAL_API_URL, json=payload, headers=headers)
+        http_client.log_stats()
         print("Personal API response:", response.status_code, response.text)
 
         return {
@@ -1,9 +1,14 @@
 import boto3
 import json
+import os
+import sys
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallel_scan import parallel_scan
+
 # AWS setup
 session = boto3.Session(region_name="us-east-1")
 dynamodb = session.resource('dynamodb')
@@ -16,13 +21,8 @@ INDEX_FILE = 'faiss_index.index'
 TEXT_FILE = 'texts.json'
 
 # Step 1: Fetch DynamoDB records
-def fetch_records():
-    response = table.scan()
-    records = response['Items']
-    while 'LastEvaluatedKey' in response:
-        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-        records.extend(response['Items'])
-    return records
+def fetch_records(segments=None):
+    return list(parallel_scan(table.name, segments=segments, client=session.client('dynamodb')))
 
 # Step 2: Convert records to searchable texts
 def build_text_chunks(records):
@@ -0,0 +1,194 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+import io
+import csv
+import json
+import uuid
+from datetime import datetime
+from parallel_scan import parallel_scan
+import serialization
+
+runtime.init_complete()
+
+BUCKET_NAME = "trackwise-exports"
+PART_SIZE = 8 * 1024 * 1024  # S3 requires >= 5 MB for every part except the last
+URL_EXPIRY = 3600
+JOBS_PREFIX = "jobs/"
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+CSV_COLUMNS = ["Date", "Type", "Amount", "Category", "Source", "Vendor"]
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+def cors_headers():
+    return {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "*",
+        "Access-Control-Allow-Methods": "OPTIONS,GET,POST"
+    }
+
+def csv_row(item):
+    return [
+        item.get("date", ""),
+        item.get("type", ""),
+        str(item.get("amount", "")),
+        item.get("category", ""),
+        item.get("source", ""),
+        item.get("vendor", "")
+    ]
+
+# Streams scan pages into a multipart upload, holding at most one part in memory
+def stream_export(key, export_format):
+    s3 = runtime.client("s3")
+    upload = s3.create_multipart_upload(
+        Bucket=BUCKET_NAME,
+        Key=key,
+        ContentType=CONTENT_TYPES[export_format]
+    )
+    upload_id = upload["UploadId"]
+    parts = []
+    buffer = io.StringIO()
+
+    def flush():
+        body = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        part = s3.upload_part(
+            Bucket=BUCKET_NAME,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=len(parts) + 1,
+            Body=body
+        )
+        parts.append({"ETag": part["ETag"], "PartNumber": len(parts) + 1})
+
+    try:
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(CSV_COLUMNS)
+
+        count = 0
+        for item in parallel_scan("TrackWiseRecords"):
+            if export_format == "csv":
+                writer.writerow(csv_row(item))
+            else:
+                buffer.write(serialization.dumps(item, compact=True) + "\n")
+            count += 1
+            if buffer.tell() >= PART_SIZE:
+                flush()
+        if buffer.tell() or not parts:
+            flush()
+
+        s3.complete_multipart_upload(
+            Bucket=BUCKET_NAME,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+        return count
+
+    except Exception:
+        s3.abort_multipart_upload(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id)
+        raise
+
+# Job status lives next to the exports, so the bucket lifecycle expires both
+def status_key(job_id):
+    return f"{JOBS_PREFIX}{job_id}.json"
+
+def put_status(job_id, status):
+    runtime.client("s3").put_object(
+        Bucket=BUCKET_NAME,
+        Key=status_key(job_id),
+        Body=json.dumps(status).encode("utf-8"),
+        ContentType="application/json"
+    )
+
+def get_status(job_id):
+    s3 = runtime.client("s3")
+    try:
+        return json.loads(s3.get_object(Bucket=BUCKET_NAME, Key=status_key(job_id))["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        return None
+
+def response(status_code, body):
+    return {
+        "statusCode": status_code,
+        "headers": cors_headers(),
+        "body": json.dumps(body)
+    }
+
+# POST /export-transactions: queue the export on an async invoke of this
+# function and answer 202 at once; large exports outlive the 30 s HTTP API
+# integration limit
+def start_export(event, context):
+    body = json.loads(event.get("body") or "{}")
+    export_format = body.get("format", "csv")
+    if export_format not in CONTENT_TYPES:
+        return response(400, {"error": "'format' must be 'csv' or 'ndjson'"})
+
+    job_id = str(uuid.uuid4())
+    filename = f"trackwise_transactions.{export_format}"
+    job = {
+        "job_id": job_id,
+        "format": export_format,
+        "filename": filename,
+        "key": f"{datetime.now().strftime('%Y-%m-%d')}/{job_id}_{filename}"
+    }
+    put_status(job_id, {"status": PENDING})
+    runtime.client("lambda").invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType="Event",
+        Payload=json.dumps({"export_job": job}).encode("utf-8")
+    )
+    return response(202, {"job_id": job_id, "status": PENDING})
+
+# Async worker invocation
+def run_export(job):
+    put_status(job["job_id"], {"status": RUNNING})
+    try:
+        count = stream_export(job["key"], job["format"])
+    except Exception as e:
+        print("Error exporting transactions:", str(e))
+        put_status(job["job_id"], {"status": FAILED, "error": str(e)})
+        return
+    put_status(job["job_id"], {"status": DONE, "key": job["key"], "filename": job["filename"], "count": count})
+
+# GET /export-transactions/{job_id}: the status, plus a download URL once done
+def export_status(job_id):
+    try:
+        uuid.UUID(job_id)
+    except (TypeError, ValueError):
+        return response(400, {"error": "Invalid job id"})
+    status = get_status(job_id)
+    if status is None:
+        return response(404, {"error": "Export not found"})
+    if status["status"] == DONE:
+        status["url"] = runtime.client("s3").generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": BUCKET_NAME,
+                "Key": status["key"],
+                "ResponseContentDisposition": f'attachment; filename="{status["filename"]}"'
+            },
+            ExpiresIn=URL_EXPIRY
+        )
+    return response(200, dict(status, job_id=job_id))
+
+def lambda_handler(event, context):
+    if "export_job" in event:
+        return run_export(event["export_job"])
+    try:
+        job_id = (event.get("pathParameters") or {}).get("job_id")
+        if job_id is not None:
+            return export_status(job_id)
+        return start_export(event, context)
+
+    except Exception as e:
+        print("Error exporting transactions:", str(e))
+        return response(500, {"error": str(e)})
@@ -1,17 +1,37 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import boto3
 import uuid
 
-s3 = boto3.client("s3")
+runtime.init_complete()
+
 BUCKET_NAME = "trackwise-bill-uploads"
 
+# Each upload kind lands under its own prefix; the bucket notifications route
+# bills/ to the Textract parser and imports/ to the statement importer
+UPLOAD_PREFIXES = {
+    "bill": "bills/",
+    "statement": "imports/"
+}
+
 def lambda_handler(event, context):
     try:
         body = json.loads(event['body'])
         filename = body.get("filename", "bill.pdf")
-        unique_filename = f"{uuid.uuid4()}_{filename}"
+        kind = body.get("kind", "bill")
+        if kind not in UPLOAD_PREFIXES:
+            return {
+                "statusCode": 400,
+                "headers": {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Headers": "*",
+                    "Access-Control-Allow-Methods": "OPTIONS,POST"
+                },
+                "body": json.dumps({"error": "'kind' must be 'bill' or 'statement'"})
+            }
+        unique_filename = f"{UPLOAD_PREFIXES[kind]}{uuid.uuid4()}_{filename}"
 
-        presigned_post = s3.generate_presigned_post(
+        presigned_post = runtime.client("s3").generate_presigned_post(
             Bucket=BUCKET_NAME,
             Key=unique_filename,
             Fields={"acl": "private"},
@@ -0,0 +1,119 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+from boto3.dynamodb.conditions import Key
+from datetime import datetime
+from decimal import Decimal
+from rollups import ROLLUP_TABLE
+import serialization
+
+runtime.init_complete()
+
+MAX_MONTHS = 120
+
+def cors_headers():
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET,OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type'
+    }
+
+def parse_month(value, name):
+    try:
+        datetime.strptime(value, '%Y-%m')
+    except ValueError:
+        raise ValueError(f"'{name}' must be a YYYY-MM month")
+    return value
+
+def month_range(start, end):
+    year, month = int(start[:4]), int(start[5:7])
+    months = []
+    while f"{year:04d}-{month:02d}" <= end:
+        months.append(f"{year:04d}-{month:02d}")
+        if len(months) > MAX_MONTHS:
+            raise ValueError(f"Range is limited to {MAX_MONTHS} months")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def query_month(month):
+    rollup_table = runtime.table(ROLLUP_TABLE)
+    response = rollup_table.query(KeyConditionExpression=Key('month').eq(month))
+    rows = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = rollup_table.query(
+            KeyConditionExpression=Key('month').eq(month),
+            ExclusiveStartKey=response['LastEvaluatedKey']
+        )
+        rows.extend(response.get('Items', []))
+    return rows
+
+def scan_rollups():
+    rollup_table = runtime.table(ROLLUP_TABLE)
+    response = rollup_table.scan()
+    rows = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = rollup_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+        rows.extend(response.get('Items', []))
+    return rows
+
+# One query per month in range; without 'from' the whole (months x categories) table is read
+def fetch_rows(params):
+    end = parse_month(params['to'], 'to') if params.get('to') else datetime.now().strftime('%Y-%m')
+    if params.get('from'):
+        rows = []
+        for month in month_range(parse_month(params['from'], 'from'), end):
+            rows.extend(query_month(month))
+        return rows
+    return [row for row in scan_rollups() if row['month'] <= end]
+
+def summarize(rows):
+    totals = {'income': Decimal('0'), 'expense': Decimal('0')}
+    months = {}
+    for row in sorted(rows, key=lambda r: (r['month'], r['bucket'])):
+        record_type = row['type']
+        if record_type not in totals:  # only income and expense are summarized
+            continue
+        month = months.setdefault(row['month'], {
+            'month': row['month'],
+            'income': Decimal('0'),
+            'expense': Decimal('0'),
+            'categories': {}
+        })
+        month[record_type] += row['total']
+        month['categories'][row['bucket']] = row['total']
+        totals[record_type] += row['total']
+
+    # Decimals are converted to JSON numbers by serialization.dumps
+    return {
+        'income': totals['income'],
+        'expense': totals['expense'],
+        'net': totals['income'] - totals['expense'],
+        'months': list(months.values())
+    }
+
+def lambda_handler(event, context):
+    try:
+        params = event.get('queryStringParameters') or {}
+        summary = summarize(fetch_rows(params))
+
+        return {
+            'statusCode': 200,
+            'headers': cors_headers(),
+            'body': serialization.dumps(summary)
+        }
+
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': cors_headers(),
+            'body': serialization.dumps({'error': str(e)})
+        }
+
+    except Exception as e:
+        print("Error fetching summary:", str(e))
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': serialization.dumps({'error': str(e)})
+        }
@@ -1,30 +1,407 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import boto3
-from decimal import Decimal
+import gzip
+import base64
+import os
+import time
+import hashlib
+import heapq
+import itertools
+from collections import OrderedDict
+from urllib.parse import unquote
+from boto3.dynamodb.conditions import Key, Attr
+from datetime import datetime
+from parallel_scan import parallel_scan
+import record_version
+import serialization
 
-# Custom encoder to handle Decimal
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+runtime.init_complete()
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Secondary indexes defined in terraform/dynamodb.tf
+TYPE_INDEX = 'type-date-index'
+CATEGORY_INDEX = 'category-date-index'
+RECORD_TYPES = ['expense', 'income']
+QUERY_PARAMS = ('from', 'to', 'type', 'category')
+
+# Attributes a client may request with ?fields=; the detail endpoint returns line_items by default
+RECORD_FIELDS = ('id', 'date', 'type', 'amount', 'category', 'source', 'vendor', 'description', 'line_items')
+DETAIL_FIELDS = 'id,line_items'
+
+# Bodies smaller than this are not worth the compression CPU
+MIN_COMPRESS_SIZE = 1024
+
+# Warm-container response cache, validated against the records write-version
+CACHE_TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "64"))
+CACHE_MAX_BODY = 2 * 1024 * 1024
+# Total across entries; the function runs at the default 128 MB
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+_response_cache = OrderedDict()
+_cache_bytes = [0]
+
+def cors_headers():
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET,OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type'
+    }
+
+# The cursor is an opaque wrapper around DynamoDB's LastEvaluatedKey
+# (one per unfinished index partition in query mode)
+def encode_cursor(state):
+    if not state:
+        return None
+    raw = serialization.dumps(state, compact=True)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        key = serialization.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid 'cursor'")
+    if not isinstance(key, dict) or not key:
+        raise ValueError("Invalid 'cursor'")
+    return key
+
+# A tampered cursor must fail as a 400 here, not as a DynamoDB validation
+# error on ExclusiveStartKey
+def check_start_key(key, attributes):
+    if not isinstance(key, dict) or set(key) != set(attributes) or not all(isinstance(value, str) and value for value in key.values()):
+        raise ValueError("Invalid 'cursor'")
+    return key
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("'limit' must be an integer")
+    if limit < 1:
+        raise ValueError("'limit' must be positive")
+    return min(limit, MAX_PAGE_SIZE)
+
+# fields=date,type,amount -> ProjectionExpression, so DynamoDB returns (and bills) less data
+def projection_kwargs(fields):
+    if not fields:
+        return {}
+    names = ['id'] + [name.strip() for name in fields.split(',') if name.strip() and name.strip() != 'id']
+    unknown = [name for name in names if name not in RECORD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s) in 'fields': {', '.join(unknown)}")
+    placeholders = {f"#f{i}": name for i, name in enumerate(dict.fromkeys(names))}
+    return {
+        'ProjectionExpression': ', '.join(placeholders),
+        'ExpressionAttributeNames': placeholders
+    }
+
+def scan_page(table, params):
+    scan_kwargs = dict(projection_kwargs(params.get('fields')), Limit=parse_limit(params.get('limit')))
+    if params.get('cursor'):
+        scan_kwargs['ExclusiveStartKey'] = check_start_key(decode_cursor(params['cursor']), ('id',))
+
+    response = table.scan(**scan_kwargs)
+    return {
+        'items': response.get('Items', []),
+        'next_cursor': encode_cursor(response.get('LastEvaluatedKey'))
+    }
+
+def parse_date(value, name):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"'{name}' must be a YYYY-MM-DD date")
+    return value
+
+# Pick the index and partition values that answer the filter with key conditions only
+def build_query_plan(params):
+    record_type = params.get('type')
+    if record_type and record_type not in RECORD_TYPES:
+        raise ValueError("'type' must be 'income' or 'expense'")
+
+    start = parse_date(params['from'], 'from') if params.get('from') else None
+    end = parse_date(params['to'], 'to') if params.get('to') else None
+    if start and end:
+        date_condition = Key('date').between(start, end)
+    elif start:
+        date_condition = Key('date').gte(start)
+    elif end:
+        date_condition = Key('date').lte(end)
+    else:
+        date_condition = None
+
+    if params.get('category'):
+        # The category partition is small, so narrowing it by type is a cheap filter
+        return {
+            'index': CATEGORY_INDEX,
+            'key': 'category',
+            'partitions': [params['category']],
+            'date_condition': date_condition,
+            'filter': Attr('type').eq(record_type) if record_type else None,
+            'fields': params.get('fields')
+        }
+
+    return {
+        'index': TYPE_INDEX,
+        'key': 'type',
+        'partitions': [record_type] if record_type else RECORD_TYPES,
+        'date_condition': date_condition,
+        'filter': None,
+        'fields': params.get('fields')
+    }
+
+# Cursor state: the partitions not read to the end, each with the key to
+# resume after (None = from the start)
+def decode_query_state(plan, cursor):
+    pending = decode_cursor(cursor).get('pending')
+    if not isinstance(pending, list) or not pending:
+        raise ValueError("Invalid 'cursor'")
+    seen = set()
+    for entry in pending:
+        if not isinstance(entry, list) or len(entry) != 2:
+            raise ValueError("Invalid 'cursor'")
+        partition, start_key = entry
+        if type(partition) is not int or not 0 <= partition < len(plan['partitions']) or partition in seen:
+            raise ValueError("Invalid 'cursor'")
+        seen.add(partition)
+        if start_key is not None:
+            # Index key, then table key; the partition value must be the one being read
+            check_start_key(start_key, ('id', plan['key'], 'date'))
+            if start_key[plan['key']] != plan['partitions'][partition]:
+                raise ValueError("Invalid 'cursor'")
+    return pending
+
+# Up to `limit` items of one partition, newest first; exhausted is True once
+# the partition has nothing after them
+def query_partition(table, plan, partition, start_key, limit, projection):
+    condition = Key(plan['key']).eq(plan['partitions'][partition])
+    if plan['date_condition'] is not None:
+        condition = condition & plan['date_condition']
+
+    items = []
+    while limit is None or len(items) < limit:
+        query_kwargs = dict(projection, **{
+            'IndexName': plan['index'],
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': False
+        })
+        if limit is not None:
+            query_kwargs['Limit'] = limit - len(items)
+        if plan['filter'] is not None:
+            query_kwargs['FilterExpression'] = plan['filter']
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+
+        response = table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key:
+            return items, True
+    return items, False
+
+# Without a type filter both type partitions are read and merged by date, so
+# every page is newest-first across income and expense. Each partition gets
+# its own resume key: the last of its items that made it onto the page.
+def run_query(table, plan, limit=None, cursor=None):
+    if cursor:
+        pending = decode_query_state(plan, cursor)
+    else:
+        pending = [[partition, None] for partition in range(len(plan['partitions']))]
+
+    # Resume keys are built from items, so the key attributes are always read
+    fields = plan['fields']
+    if fields:
+        fields = ','.join([fields, 'date', plan['key']])
+    projection = projection_kwargs(fields)
+
+    fetched = []
+    for partition, start_key in pending:
+        items, exhausted = query_partition(table, plan, partition, start_key, limit, projection)
+        fetched.append((partition, start_key, items, exhausted))
+
+    merged = heapq.merge(
+        *[[(partition, item) for item in items] for partition, _, items, _ in fetched],
+        key=lambda entry: entry[1]['date'],
+        reverse=True
+    )
+    page = list(itertools.islice(merged, limit))
+
+    last_taken = {}
+    for partition, item in page:
+        last_taken[partition] = item
+    next_pending = []
+    for partition, start_key, items, exhausted in fetched:
+        taken = sum(1 for entry in page if entry[0] == partition)
+        if exhausted and taken == len(items):
+            continue
+        if taken:
+            item = last_taken[partition]
+            start_key = {'id': item['id'], plan['key']: item[plan['key']], 'date': item['date']}
+        next_pending.append([partition, start_key])
+
+    items = [item for _, item in page]
+    if plan['fields']:
+        wanted = set(projection_kwargs(plan['fields'])['ExpressionAttributeNames'].values())
+        items = [{name: value for name, value in item.items() if name in wanted} for item in items]
+    return items, ({'pending': next_pending} if next_pending else None)
+
+def query_page(table, params):
+    items, next_state = run_query(
+        table,
+        build_query_plan(params),
+        limit=parse_limit(params.get('limit')),
+        cursor=params.get('cursor')
+    )
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(next_state)
+    }
+
+def query_all(table, params):
+    items, _ = run_query(table, build_query_plan(params))
+    return items
+
+def scan_all(table, params):
+    return list(parallel_scan(table.name, **projection_kwargs(params.get('fields'))))
+
+# Single-record read used by the dashboard to load line_items on demand
+def get_detail(table, record_id, params):
+    response = table.get_item(
+        Key={'id': record_id},
+        **projection_kwargs(params.get('fields') or DETAIL_FIELDS)
+    )
+    return response.get('Item')
+
+# Weak ETag: same table version and query means the same JSON, whatever the encoding
+def make_etag(version, params):
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha1(f"{version}:{canonical}".encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(etag, if_none_match):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or etag[2:] in candidates
+
+def encode_body(body, accept_encoding):
+    accepted = [part.split(';')[0].strip() for part in accept_encoding.lower().split(',')]
+    if len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if brotli is not None and 'br' in accepted:
+        return base64.b64encode(brotli.compress(body.encode('utf-8'))).decode('ascii'), 'br'
+    if 'gzip' in accepted:
+        return base64.b64encode(gzip.compress(body.encode('utf-8'), compresslevel=6)).decode('ascii'), 'gzip'
+    return body, None
+
+def build_response(body, cache_headers, request_headers):
+    body, encoding = encode_body(body, request_headers.get('accept-encoding', ''))
+    response = {
+        'statusCode': 200,
+        'headers': dict(cache_headers, **{'Content-Type': 'application/json'}),
+        'body': body
+    }
+    if encoding:
+        response['headers']['Content-Encoding'] = encoding
+        response['isBase64Encoded'] = True
+    return response
+
+def cache_get(key, version):
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    cached_version, expires_at, body = entry
+    if cached_version != version or expires_at < time.monotonic():
+        cache_evict(key)
+        return None
+    _response_cache.move_to_end(key)
+    return body
+
+def cache_evict(key):
+    _cache_bytes[0] -= len(_response_cache.pop(key)[2])
+
+def cache_put(key, version, body):
+    if len(body) > CACHE_MAX_BODY:
+        return
+    if key in _response_cache:
+        cache_evict(key)
+    _response_cache[key] = (version, time.monotonic() + CACHE_TTL_SECONDS, body)
+    _cache_bytes[0] += len(body)
+    while len(_response_cache) > CACHE_MAX_ENTRIES or _cache_bytes[0] > CACHE_MAX_BYTES:
+        cache_evict(next(iter(_response_cache)))
 
 def lambda_handler(event, context):
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('TrackWiseRecords')
+        params = event.get('queryStringParameters') or {}
+        # Bill ids are S3 keys ("bills/<uuid>_name.pdf#2"), hence the greedy {id+}
+        # route; clients percent-encode the id, '#' in particular
+        record_id = (event.get('pathParameters') or {}).get('id')
+        record_id = unquote(record_id) if record_id else None
+        headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+
+        # Answer revalidations from the version counter alone, without touching the table
+        version = record_version.current()
+        cache_key = json.dumps({'id': record_id, 'query': params}, sort_keys=True)
+        etag = make_etag(version, {'id': record_id, 'query': params})
+        cache_headers = dict(cors_headers(), **{
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        })
+        if etag_matches(etag, headers.get('if-none-match')):
+            return {
+                'statusCode': 304,
+                'headers': cache_headers,
+                'body': ''
+            }
+
+        # Nothing written since this container built the same response
+        cached_body = cache_get(cache_key, version)
+        if cached_body is not None:
+            return build_response(cached_body, cache_headers, headers)
 
-        response = table.scan()
-        items = response.get('Items', [])
+        table = runtime.table('TrackWiseRecords')
 
+        paginated = 'limit' in params or 'cursor' in params
+
+        # Detail mode: GET /get-transactions/{id+}
+        if record_id:
+            result = get_detail(table, record_id, params)
+            if result is None:
+                return {
+                    'statusCode': 404,
+                    'headers': cors_headers(),
+                    'body': json.dumps({'error': 'Record not found'})
+                }
+        # Query mode: from/to/type/category are answered from a secondary index
+        elif any(params.get(name) for name in QUERY_PARAMS):
+            result = query_page(table, params) if paginated else query_all(table, params)
+        # Paginated mode: one bounded page per request plus a continuation cursor
+        elif paginated:
+            result = scan_page(table, params)
+        # Export mode: the whole table, read with a parallel segmented scan
+        else:
+            result = scan_all(table, params)
+
+        body = serialization.dumps(result, compact=True)
+        cache_put(cache_key, version, body)
+        return build_response(body, cache_headers, headers)
+
+    except ValueError as e:
         return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type'
-            },
-            'body': json.dumps(items, cls=DecimalEncoder)
+            'statusCode': 400,
+            'headers': cors_headers(),
+            'body': json.dumps({'error': str(e)})
         }
 
     except Exception as e:
@@ -0,0 +1,73 @@
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import runtime
+
+# One keep-alive Session per destination, cached for the life of the warm
+# container, so repeat invocations reuse the TCP+TLS connection instead of
+# handshaking on every call. Kept identical in trackwise-backend and
+# trackwise-embedding/lambda.
+
+DEFAULT_TIMEOUT = (3.05, 10)  # connect, read
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_created = []
+
+class Client:
+    def __init__(self, name, timeout, retries, backoff, pool_size, retry_post):
+        self.name = name
+        self.timeout = timeout
+        methods = Retry.DEFAULT_ALLOWED_METHODS | {"POST"} if retry_post else Retry.DEFAULT_ALLOWED_METHODS
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=methods,
+            respect_retry_after_header=True,
+            raise_on_status=False  # hand the last response back; callers decide via raise_for_status
+        )
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    # Requests vs. connections opened across the pools still held by this client
+    def stats(self):
+        pools = self.adapter.poolmanager.pools
+        sent = opened = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                sent += pool.num_requests
+                opened += pool.num_connections
+        return {"client": self.name, "requests": sent, "connections": opened, "reused": max(sent - opened, 0)}
+
+# retry_post: only for destinations where a repeated POST is safe (searches,
+# id-keyed indexing)
+def client(name, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.3, pool_size=10, retry_post=False):
+    def build():
+        created = Client(name, timeout, retries, backoff, pool_size, retry_post)
+        _created.append(created)
+        return created
+    return runtime.cached(("http", name), build)
+
+def log_stats():
+    if _created:
+        print(json.dumps({"metric": "http_pool", "clients": [created.stats() for created in _created]}))
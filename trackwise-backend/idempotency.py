@@ -0,0 +1,116 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer
+import runtime
+
+# Idempotency-Key support for write endpoints. The first request with a key
+# claims it in TrackWiseIdempotency; once it finishes, its response is stored
+# there (and in a per-container front cache) and replays of the same key get
+# that response back without touching TrackWiseRecords again.
+
+IDEMPOTENCY_TABLE = "TrackWiseIdempotency"
+TTL_SECONDS = 24 * 3600  # DynamoDB TTL on expires_at removes old keys
+LOCK_SECONDS = 60  # default; a claim left behind by a crashed invocation can be retaken after this
+CACHE_MAX_ENTRIES = 512
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_deserializer = TypeDeserializer()
+
+class KeyReused(Exception):
+    pass
+
+class RequestInProgress(Exception):
+    pass
+
+def fingerprint(body):
+    return hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+
+def cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.time():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry
+
+def cache_put(key, entry):
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+def replay(key, body_fingerprint, entry):
+    if entry["fingerprint"] != body_fingerprint:
+        raise KeyReused(key)
+    if entry["status"] != COMPLETED:
+        raise RequestInProgress(key)
+    response = json.loads(entry["response"])
+    response.setdefault("headers", {})["Idempotent-Replayed"] = "true"
+    return response
+
+# Returns the stored response for a completed key, or None once this request
+# owns the key. Raises KeyReused when the key was used with a different body
+# and RequestInProgress while another request holds it. lock_seconds must
+# cover the longest the owner can run (at least its function timeout).
+def claim(key, body_fingerprint, lock_seconds=LOCK_SECONDS):
+    cached = cache_get(key)
+    if cached is not None:
+        return replay(key, body_fingerprint, cached)
+
+    now = int(time.time())
+    try:
+        runtime.table(IDEMPOTENCY_TABLE).put_item(
+            Item={
+                "request_key": key,
+                "status": IN_PROGRESS,
+                "fingerprint": body_fingerprint,
+                "locked_until": now + lock_seconds,
+                "expires_at": now + TTL_SECONDS
+            },
+            ConditionExpression="attribute_not_exists(request_key) OR expires_at < :now OR (#status = :in_progress AND locked_until < :now)",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={":now": now, ":in_progress": IN_PROGRESS},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+        return None
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        entry = e.response.get("Item")
+        if entry is None:
+            entry = runtime.table(IDEMPOTENCY_TABLE).get_item(Key={"request_key": key}, ConsistentRead=True).get("Item")
+            if entry is None:  # removed between the two calls; claim it again
+                return claim(key, body_fingerprint, lock_seconds)
+        else:
+            entry = {name: _deserializer.deserialize(value) for name, value in entry.items()}
+
+    if entry["status"] == COMPLETED:
+        cache_put(key, entry)
+    return replay(key, body_fingerprint, entry)
+
+def complete(key, body_fingerprint, response):
+    entry = {
+        "request_key": key,
+        "status": COMPLETED,
+        "fingerprint": body_fingerprint,
+        "response": json.dumps(response),
+        "expires_at": int(time.time()) + TTL_SECONDS
+    }
+    runtime.table(IDEMPOTENCY_TABLE).put_item(Item=entry)
+    cache_put(key, entry)
+
+# Drops the claim so the client can retry after a failure
+def release(key):
+    runtime.table(IDEMPOTENCY_TABLE).delete_item(Key={"request_key": key})
@@ -1,66 +1,153 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-from decimal import Decimal
-import boto3
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 import uuid
-import requests
-import os
+import record_store
+import idempotency
+import serialization
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('TrackWiseRecords')
+runtime.init_complete()
 
-EMBEDDING_API = os.environ["EMBEDDING_API"]
-AUTH_TOKEN = os.environ["AUTH_TOKEN"]
+BATCH_ROUTE = "POST /manual-entry/batch"
+MAX_BATCH_RECORDS = 1000
+REQUIRED_FIELDS = ("type", "amount", "date", "category", "description")
+RECORD_TYPES = ("income", "expense")
 
-def notify_embedding(record):
+def cors_headers():
+    return {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "*",
+        "Access-Control-Allow-Methods": "*"
+    }
+
+def build_item(body):
+    if not isinstance(body, dict):
+        raise ValueError("record must be an object")
+    missing = [field for field in REQUIRED_FIELDS if field not in body]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if body["type"] not in RECORD_TYPES:
+        raise ValueError("'type' must be 'income' or 'expense'")
     try:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {AUTH_TOKEN}"
-        }
-        res = requests.post(EMBEDDING_API, json=record, headers=headers)
-        print("Embedding API response:", res.status_code, res.text)
-    except Exception as e:
-        print("Failed to notify embedding service:", str(e))
+        amount = Decimal(str(body["amount"]))
+    except InvalidOperation:
+        raise ValueError("'amount' must be a number")
+    if not amount.is_finite():  # NaN/Infinity parse but DynamoDB rejects them
+        raise ValueError("'amount' must be a finite number")
+    try:
+        datetime.strptime(body["date"], "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError("'date' must be a YYYY-MM-DD date")
+    # category keys category-date-index, which rejects empty and non-string values
+    if not isinstance(body["category"], str) or not body["category"].strip():
+        raise ValueError("'category' must be a non-empty string")
+    for field in ("description", "vendor"):
+        if not isinstance(body.get(field, ""), str):
+            raise ValueError(f"'{field}' must be a string")
+
+    return {
+        "id": str(uuid.uuid4()),
+        "type": body["type"],
+        "amount": amount,
+        "date": body["date"],
+        "category": body["category"],
+        "description": body["description"],
+        "vendor": body.get("vendor", ""),
+        "source": "manual"
+    }
+
+# Validates the whole batch up front so a bad row rejects the request before anything is written
+def build_items(records):
+    if not isinstance(records, list) or not records:
+        raise ValueError("'records' must be a non-empty array")
+    if len(records) > MAX_BATCH_RECORDS:
+        raise ValueError(f"At most {MAX_BATCH_RECORDS} records per batch")
 
+    items, errors = [], []
+    for index, record in enumerate(records):
+        try:
+            items.append(build_item(record))
+        except ValueError as e:
+            errors.append(f"records[{index}]: {e}")
+    if errors:
+        raise ValueError("; ".join(errors[:20]))
+    return items
+
+# A request with an Idempotency-Key header is processed once per key; retries
+# get the first response back instead of writing the record again
 def lambda_handler(event, context):
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    request_key = headers.get("idempotency-key")
+    if not request_key:
+        return handle(event)
+
+    key = f"{event.get('routeKey', '')}#{request_key}"
+    body_fingerprint = idempotency.fingerprint(event.get("body"))
     try:
-        body = json.loads(event['body'], parse_float=Decimal)
-        record_id = str(uuid.uuid4())
-
-        item = {
-            "id": record_id,
-            "type": body["type"],
-            "amount": Decimal(str(body["amount"])),
-            "date": body["date"],
-            "category": body["category"],
-            "description": body["description"],
-            "vendor": body.get("vendor", ""),
-            "source": "manual"
-        }
+        stored = idempotency.claim(key, body_fingerprint)
+    except idempotency.KeyReused:
+        return error_response(422, "Idempotency-Key was already used with a different request body")
+    except idempotency.RequestInProgress:
+        return error_response(409, "A request with this Idempotency-Key is still in progress")
+    except Exception as e:
+        print("Idempotency check failed:", str(e))
+        return error_response(500, str(e))
+    if stored is not None:
+        return stored
 
-        table.put_item(Item=item)
+    response = handle(event)
+    try:
+        if response["statusCode"] < 500:
+            idempotency.complete(key, body_fingerprint, response)
+        else:
+            idempotency.release(key)
+    except Exception as e:
+        print("Failed to record idempotent response:", str(e))
+    return response
+
+def error_response(status, message):
+    return {
+        "statusCode": status,
+        "headers": cors_headers(),
+        "body": json.dumps({"error": message})
+    }
+
+def handle(event):
+    try:
+        body = serialization.loads(event['body'])
+
+        if event.get("routeKey") == BATCH_ROUTE:
+            items = build_items(body.get("records") if isinstance(body, dict) else body)
+            record_store.put_records(items, new=True)
 
-        # Notify personal AWS embedding Lambda
-        notify_embedding(item)
+            return {
+                "statusCode": 200,
+                "headers": cors_headers(),
+                "body": json.dumps({"message": "Success", "count": len(items)})
+            }
+
+        item = build_item(body)
+        record_store.put_record(item)
 
         return {
             "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
-            "body": json.dumps({"message": "Success"})
+            "headers": cors_headers(),
+            "body": json.dumps({"message": "Success", "id": item["id"]})
+        }
+
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "headers": cors_headers(),
+            "body": json.dumps({"error": str(e)})
         }
 
     except Exception as e:
         print("Error:", str(e))
         return {
             "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "*"
-            },
+            "headers": cors_headers(),
             "body": json.dumps({"error": str(e)})
         }
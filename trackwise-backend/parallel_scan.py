@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeDeserializer
+import runtime
+
+# Number of DynamoDB scan segments read concurrently
+DEFAULT_SEGMENTS = int(os.environ.get("SCAN_SEGMENTS", "4"))
+
+_SEGMENT_DONE = object()
+_deserializer = TypeDeserializer()
+
+def to_item(raw):
+    return {key: _deserializer.deserialize(value) for key, value in raw.items()}
+
+# Yields items from a Segment/TotalSegments scan as pages arrive from any
+# worker. Segments scan through a low-level client, which unlike a boto3
+# Table resource is safe to share between threads.
+def parallel_scan(table_name, segments=None, client=None, **scan_kwargs):
+    segments = segments or DEFAULT_SEGMENTS
+    client = client or runtime.client("dynamodb")
+    pages = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+
+    def put(entry):
+        # Bounded queue gives backpressure; bail out if the consumer went away
+        while not stop.is_set():
+            try:
+                pages.put(entry, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def scan_segment(segment):
+        try:
+            kwargs = dict(scan_kwargs, TableName=table_name, Segment=segment, TotalSegments=segments)
+            while not stop.is_set():
+                response = client.scan(**kwargs)
+                put([to_item(raw) for raw in response.get("Items", [])])
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as e:
+            put(e)
+        finally:
+            put(_SEGMENT_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=segments)
+    for segment in range(segments):
+        executor.submit(scan_segment, segment)
+
+    remaining = segments
+    try:
+        while remaining:
+            page = pages.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+# Benchmark: python parallel_scan.py [--items N] [--endpoint-url http://localhost:8000 --table NAME]
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    class LocalClient:
+        # In-memory stand-in that serves scan pages with a fixed per-request latency
+        def __init__(self, item_count, page_size, latency):
+            self.items = [{"id": {"S": f"rec-{i:07d}"}, "amount": {"N": str(i)}} for i in range(item_count)]
+            self.page_size = page_size
+            self.latency = latency
+
+        def scan(self, TableName=None, Segment=0, TotalSegments=1, ExclusiveStartKey=None, **kwargs):
+            time.sleep(self.latency)
+            segment_items = self.items[Segment::TotalSegments]
+            start = ExclusiveStartKey["offset"] if ExclusiveStartKey else 0
+            end = start + self.page_size
+            response = {"Items": segment_items[start:end]}
+            if end < len(segment_items):
+                response["LastEvaluatedKey"] = {"offset": end}
+            return response
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--segments", default="1,2,4,8,16")
+    parser.add_argument("--endpoint-url")
+    parser.add_argument("--table", default="TrackWiseRecords")
+    args = parser.parse_args()
+
+    if args.endpoint_url:
+        import boto3
+        client = boto3.client("dynamodb", endpoint_url=args.endpoint_url)
+    else:
+        client = LocalClient(args.items, args.page_size, args.latency)
+
+    for count in [int(s) for s in args.segments.split(",")]:
+        started = time.perf_counter()
+        total = sum(1 for _ in parallel_scan(args.table, segments=count, client=client))
+        elapsed = time.perf_counter() - started
+        print(f"segments={count:<3} items={total} elapsed={elapsed:.2f}s")
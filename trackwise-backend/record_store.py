@@ -0,0 +1,86 @@
+import time
+import random
+import runtime
+import rollups
+import record_version
+
+RECORDS_TABLE = "TrackWiseRecords"
+BATCH_SIZE = 25  # BatchWriteItem limit
+MAX_ATTEMPTS = 8
+BASE_DELAY = 0.05
+MAX_DELAY = 2.0
+
+# Every write to TrackWiseRecords goes through here so rollups and the
+# write-version stay in step with the table. A write that overwrites a record
+# (SNS/S3 redelivery, re-imports) only moves the rollups by the difference.
+def put_record(item):
+    old = runtime.table(RECORDS_TABLE).put_item(Item=item, ReturnValues="ALL_OLD").get("Attributes")
+    if old is not None:
+        rollups.apply_record(old, sign=-1)
+    rollups.apply_record(item)
+    record_version.bump()
+
+# BatchWriteItem cannot return old images, so existing records are read
+# first; callers that just minted the ids (uuid4) pass new=True to skip that
+def put_records(items, new=False):
+    if not items:
+        return
+    if new:
+        replace_records([(None, item) for item in items])
+        return
+    existing = {record["id"]: record for record in get_records([item["id"] for item in items])}
+    replace_records([(existing.get(item["id"]), item) for item in items])
+
+# Retries UnprocessedItems with capped exponential backoff and full jitter.
+# Returns (requests not written, error or None): earlier attempts may have
+# written part of the batch before a later one failed, and callers need to
+# know which part.
+def write_batch(dynamodb, requests):
+    pending = requests
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** (attempt - 1))))
+        try:
+            response = dynamodb.batch_write_item(RequestItems={RECORDS_TABLE: pending})
+        except Exception as e:
+            return pending, e
+        pending = (response.get("UnprocessedItems") or {}).get(RECORDS_TABLE, [])
+        if not pending:
+            return [], None
+    return pending, Exception(f"{len(pending)} records still unprocessed after {MAX_ATTEMPTS} attempts")
+
+def get_records(ids):
+    dynamodb = runtime.resource("dynamodb")
+    found = []
+    for start in range(0, len(ids), 100):  # BatchGetItem limit
+        pending = {RECORDS_TABLE: {"Keys": [{"id": record_id} for record_id in ids[start:start + 100]]}}
+        while pending:
+            response = dynamodb.batch_get_item(RequestItems=pending)
+            found.extend(response["Responses"].get(RECORDS_TABLE, []))
+            pending = response.get("UnprocessedKeys") or {}
+    return found
+
+# Rewrites existing records; each (old, new) pair moves the old amount out of
+# its rollup row and the new one in (old may be None for a new record). Each
+# chunk's rollups move as soon as it is written, so a failure partway through
+# never leaves committed records out of the totals.
+def replace_records(pairs):
+    if not pairs:
+        return
+    dynamodb = runtime.resource("dynamodb")
+    try:
+        for start in range(0, len(pairs), BATCH_SIZE):
+            chunk = pairs[start:start + BATCH_SIZE]
+            unprocessed, error = write_batch(dynamodb, [{"PutRequest": {"Item": new}} for _, new in chunk])
+            failed = {request["PutRequest"]["Item"]["id"] for request in unprocessed}
+            apply_moves([(old, new) for old, new in chunk if new["id"] not in failed])
+            if error is not None:
+                raise error
+    finally:
+        record_version.bump()
+
+def apply_moves(pairs):
+    # Rewrites that leave amount, month, type and category alone cancel out
+    moved = [(old, new) for old, new in pairs if old is None or rollups.rollup_key(old) != rollups.rollup_key(new) or old["amount"] != new["amount"]]
+    rollups.apply_records([old for old, _ in moved if old is not None], sign=-1)
+    rollups.apply_records([new for _, new in moved])
@@ -0,0 +1,17 @@
+import runtime
+
+META_TABLE = "TrackWiseMeta"
+VERSION_KEY = {"name": "records"}
+
+# Monotonic counter bumped after every write to TrackWiseRecords
+def bump():
+    runtime.table(META_TABLE).update_item(
+        Key=VERSION_KEY,
+        UpdateExpression="ADD #version :one",
+        ExpressionAttributeNames={"#version": "version"},
+        ExpressionAttributeValues={":one": 1}
+    )
+
+def current():
+    response = runtime.table(META_TABLE).get_item(Key=VERSION_KEY, ConsistentRead=True)
+    return int(response.get("Item", {}).get("version", 0))
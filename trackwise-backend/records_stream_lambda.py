@@ -0,0 +1,87 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+import os
+import http_client
+import record_version
+from boto3.dynamodb.types import TypeDeserializer
+import serialization
+
+runtime.init_complete()
+
+EMBEDDING_API = os.environ["EMBEDDING_API"]
+AUTH_TOKEN = os.environ["AUTH_TOKEN"]
+POST_BATCH_SIZE = 100  # records per embedder call; embedded 8 at a time and indexed with one _bulk
+REQUEST_TIMEOUT = (3.05, 60)  # connect, read: a full batch of Bedrock calls
+
+# Fields the embedder turns into text; a MODIFY that changes none of them is skipped
+INDEXED_FIELDS = ("type", "amount", "date", "category", "description", "vendor", "line_items")
+
+_deserializer = TypeDeserializer()
+
+def to_item(image):
+    return {key: _deserializer.deserialize(value) for key, value in image.items()}
+
+# Collapses the batch to the latest change per record id (None = removed). Each
+# change keeps the sequence number of its first event, so the changes come out
+# in stream order and a retry from that number replays everything after it.
+def group_changes(stream_records):
+    changes = {}
+    for record in stream_records:
+        change = record["dynamodb"]
+        record_id = to_item(change["Keys"])["id"]
+
+        if record["eventName"] == "REMOVE":
+            item = None
+        else:
+            item = to_item(change["NewImage"])
+            if record["eventName"] == "MODIFY" and "OldImage" in change:
+                old = to_item(change["OldImage"])
+                if all(old.get(field) == item.get(field) for field in INDEXED_FIELDS):
+                    continue
+
+        sequence = changes[record_id][0] if record_id in changes else change["SequenceNumber"]
+        changes[record_id] = (sequence, item)
+    return changes
+
+def post_changes(changes):
+    payload = {
+        "records": [item for _, (_, item) in changes if item is not None],
+        "deletes": [record_id for record_id, (_, item) in changes if item is None]
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {AUTH_TOKEN}"
+    }
+    # Indexing is keyed by record id, so a retried POST is safe
+    embedder = http_client.client("embedding", timeout=REQUEST_TIMEOUT, retry_post=True)
+    res = embedder.post(
+        EMBEDDING_API,
+        data=serialization.dumps(payload, compact=True).encode("utf-8"),
+        headers=headers
+    )
+    print("Embedding API response:", res.status_code, len(payload["records"]), "upserts", len(payload["deletes"]), "deletes")
+    # 422: the rest was indexed and these items fail the same way on every
+    # retry, so they are logged instead of holding up the shard
+    if res.status_code == 422:
+        print("Skipped unindexable records:", serialization.dumps(res.json().get("failed", [])[:20]))
+        return
+    res.raise_for_status()
+
+# Stream event source mapping with ReportBatchItemFailures: returning the first
+# unindexed sequence number checkpoints everything before it
+def lambda_handler(event, context):
+    # The stream sees writes record_store does not (console edits, deletes),
+    # so cached get-transactions responses and ETags are invalidated here too
+    if event.get("Records"):
+        record_version.bump()
+    changes = list(group_changes(event.get("Records", [])).items())
+    for start in range(0, len(changes), POST_BATCH_SIZE):
+        chunk = changes[start:start + POST_BATCH_SIZE]
+        try:
+            post_changes(chunk)
+        except Exception as e:
+            print("Failed to index stream changes:", str(e))
+            http_client.log_stats()
+            return {"batchItemFailures": [{"itemIdentifier": chunk[0][1][0]}]}
+    http_client.log_stats()
+    return {"batchItemFailures": []}
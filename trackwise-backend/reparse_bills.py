@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import runtime
+import record_store
+import textract_expense
+
+# Replays archived Textract responses (textract/ in the bill bucket) through
+# the current parser and rewrites records whose parsed fields changed.
+# Parsing runs on a process pool, so a fleet-wide reparse costs local CPU
+# instead of new Textract calls.
+#
+#   python reparse_bills.py --dry-run
+#   aws s3 sync s3://trackwise-bill-uploads/textract/ ./textract && python reparse_bills.py --dir ./textract
+
+BUCKET_NAME = "trackwise-bill-uploads"
+CHUNK = 500  # archives held in memory at once
+DOWNLOAD_WORKERS = 16
+
+# Fields that are not derived from the document and must survive a reparse
+PRESERVED_FIELDS = ("date",)
+
+def s3_archives(bucket):
+    paginator = runtime.client("s3").get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=textract_expense.ARCHIVE_PREFIX):
+        for obj in page.get("Contents", []):
+            yield obj["Key"]
+
+def local_archives(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".json"):
+                yield os.path.join(root, name)
+
+def load_s3(bucket):
+    def load(key):
+        return runtime.client("s3").get_object(Bucket=bucket, Key=key)["Body"].read()
+    return load
+
+def load_local(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+# Runs in worker processes: raw archive bytes -> records
+def reparse(raw):
+    return textract_expense.records_from_archive(json.loads(raw))
+
+def chunks(iterable, size):
+    chunk = []
+    for value in iterable:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run(sources, load, workers, dry_run):
+    totals = {"archives": 0, "changed": 0, "added": 0, "unchanged": 0, "missing": 0}
+    with ThreadPoolExecutor(DOWNLOAD_WORKERS) as io_pool, ProcessPoolExecutor(workers) as cpu_pool:
+        for chunk in chunks(sources, CHUNK):
+            raws = list(io_pool.map(load, chunk))
+            parsed = list(cpu_pool.map(reparse, raws, chunksize=max(1, len(raws) // (workers * 4))))
+            ids = [record["id"] for records in parsed for record in records]
+            existing = {record["id"]: record for record in record_store.get_records(ids)}
+
+            pairs = []
+            for records in parsed:
+                # The first record carries the upload key; if it was deleted the
+                # whole upload stays deleted
+                primary = existing.get(records[0]["id"])
+                if primary is None:
+                    totals["missing"] += 1
+                    continue
+                for record in records:
+                    old = existing.get(record["id"])
+                    for field in PRESERVED_FIELDS:
+                        if field in (old or primary):
+                            record[field] = (old or primary)[field]
+                    if old is None:
+                        # Extra receipt in a bundle parsed before multi-document support
+                        totals["added"] += 1
+                        pairs.append((None, record))
+                    elif record == old:
+                        totals["unchanged"] += 1
+                    else:
+                        totals["changed"] += 1
+                        pairs.append((old, record))
+
+            totals["archives"] += len(raws)
+            if pairs and not dry_run:
+                record_store.replace_records(pairs)
+            print(json.dumps(totals))
+    return totals
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bucket", default=BUCKET_NAME)
+    parser.add_argument("--dir", help="read archives synced locally instead of from S3")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.dir:
+        totals = run(local_archives(args.dir), load_local, args.workers, args.dry_run)
+    else:
+        totals = run(s3_archives(args.bucket), load_s3(args.bucket), args.workers, args.dry_run)
+    print(f"Reparsed {totals['archives']} archives in {time.perf_counter() - started:.1f}s")
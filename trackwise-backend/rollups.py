@@ -0,0 +1,39 @@
+import runtime
+
+ROLLUP_TABLE = "TrackWiseRollups"
+
+# One rollup row per month x type x category, e.g. ("2025-05", "expense#Food")
+def rollup_key(record):
+    return {
+        "month": record["date"][:7],
+        "bucket": f"{record['type']}#{record.get('category', 'Uncategorized')}"
+    }
+
+# Atomically adds (sign=1) or removes (sign=-1) a record's amount from its rollup row
+def apply_record(record, sign=1):
+    update_rollup(record, record["amount"] * sign, sign)
+
+def update_rollup(record, amount, count):
+    runtime.table(ROLLUP_TABLE).update_item(
+        Key=rollup_key(record),
+        UpdateExpression="SET #type = :type, category = :category ADD #total :amount, record_count :count",
+        ExpressionAttributeNames={"#type": "type", "#total": "total"},
+        ExpressionAttributeValues={
+            ":type": record["type"],
+            ":category": record.get("category", "Uncategorized"),
+            ":amount": amount,
+            ":count": count
+        }
+    )
+
+# Sums a batch per rollup row first, so N records cost one update per month x type x category
+def apply_records(records, sign=1):
+    grouped = {}
+    for record in records:
+        key = rollup_key(record)
+        entry = grouped.setdefault((key["month"], key["bucket"]), {"record": record, "amount": 0, "count": 0})
+        entry["amount"] += record["amount"]
+        entry["count"] += 1
+
+    for entry in grouped.values():
+        update_rollup(entry["record"], entry["amount"] * sign, entry["count"] * sign)
@@ -0,0 +1,60 @@
+import os
+from urllib.parse import unquote_plus
+from concurrent.futures import ThreadPoolExecutor
+
+# S3 can deliver several objects in one event; every record is handled, on a
+# bounded pool so slow calls for one object overlap with the others
+MAX_WORKERS = int(os.environ.get("S3_EVENT_WORKERS", "8"))
+
+def object_locations(event):
+    return [
+        (record['s3']['bucket']['name'], unquote_plus(record['s3']['object']['key']))
+        for record in event.get('Records', [])
+    ]
+
+# Calls handle(bucket, key) for every object and returns one result per
+# object: {"key", "ok", "result"} or {"key", "ok", "error"}
+def process_objects(event, handle, max_workers=MAX_WORKERS):
+    locations = object_locations(event)
+
+    def run(location):
+        bucket, key = location
+        try:
+            return {"key": key, "ok": True, "result": handle(bucket, key)}
+        except Exception as e:
+            print("Error processing", key, str(e))
+            return {"key": key, "ok": False, "error": str(e)}
+
+    if len(locations) <= 1:
+        return [run(location) for location in locations]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(locations))) as pool:
+        return list(pool.map(run, locations))
+
+# S3 invokes its handlers asynchronously, so a returned status is never read
+# and only a raised error gets the event retried. Called after every object
+# was attempted; handlers must make a retried object a no-op.
+def raise_on_failure(results):
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        raise Exception(f"{len(failed)} of {len(results)} objects failed: " + "; ".join(f"{result['key']}: {result['error']}" for result in failed[:10]))
+
+# Benchmark: python s3_events.py [--objects N] [--latency S]
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", default="1,4,8,16")
+    args = parser.parse_args()
+
+    event = {"Records": [
+        {"s3": {"bucket": {"name": "trackwise-bill-uploads"}, "object": {"key": f"bills/{i}_bill.pdf"}}}
+        for i in range(args.objects)
+    ]}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        started = time.perf_counter()
+        results = process_objects(event, lambda bucket, key: time.sleep(args.latency), max_workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"workers={workers:<3} objects={len(results)} elapsed={elapsed:.2f}s")
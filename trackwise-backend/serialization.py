@@ -0,0 +1,76 @@
+import json
+from decimal import Decimal
+
+def _default(value):
+    # Only reached for values the C encoder cannot handle natively
+    if type(value) is Decimal:
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Built once per container. DynamoDB items are trees, so the per-container
+# circular-reference bookkeeping is skipped; Decimals (including nested
+# line_items amounts) are converted inline during the single encoding pass.
+_encoder = json.JSONEncoder(default=_default, check_circular=False, ensure_ascii=False)
+_compact_encoder = json.JSONEncoder(default=_default, check_circular=False, ensure_ascii=False, separators=(",", ":"))
+
+def dumps(value, compact=False):
+    return (_compact_encoder if compact else _encoder).encode(value)
+
+def loads(text):
+    return json.loads(text, parse_float=Decimal)
+
+# Benchmark: python serialization.py [--records N]
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    class DecimalEncoder(json.JSONEncoder):
+        def default(self, obj):
+            if isinstance(obj, Decimal):
+                return float(obj)
+            return super(DecimalEncoder, self).default(obj)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(7)
+    records = []
+    for i in range(args.records):
+        record = {
+            "id": f"rec-{i}",
+            "type": random.choice(["income", "expense"]),
+            "amount": Decimal(f"{random.uniform(1, 500):.2f}"),
+            "date": f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "category": random.choice(["Food", "Travel", "Salary", "Utilities"]),
+            "description": "Synthetic record",
+            "vendor": random.choice(["Walmart", "Amazon", "Dollar Tree", ""]),
+            "source": random.choice(["manual", "textract"])
+        }
+        if record["source"] == "textract":
+            record["line_items"] = [
+                {"item": f"Item {n}", "amount": Decimal(f"{random.uniform(1, 50):.2f}"), "category": "Uncategorized"}
+                for n in range(random.randint(1, 6))
+            ]
+        records.append(record)
+
+    def best_of(fn):
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            output = fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings), len(output.encode("utf-8"))
+
+    legacy, legacy_size = best_of(lambda: json.dumps(records, cls=DecimalEncoder))
+    shared, shared_size = best_of(lambda: dumps(records))
+    compact, compact_size = best_of(lambda: dumps(records, compact=True))
+
+    print(f"records={args.records}")
+    print(f"DecimalEncoder       {legacy:.3f}s  {legacy_size} bytes")
+    print(f"serialization.dumps  {shared:.3f}s  {shared_size} bytes  ({legacy / shared:.2f}x)")
+    print(f"  compact=True       {compact:.3f}s  {compact_size} bytes  ({legacy / compact:.2f}x)")
@@ -0,0 +1,136 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+import json
+import uuid
+import record_store
+import idempotency
+import statement_parsers
+import s3_events
+
+runtime.init_complete()
+
+WRITE_CHUNK = 1000  # rows held in memory between BatchWriteItem rounds
+READ_CHUNK = 64 * 1024
+MAX_REPORTED_ERRORS = 50
+IMPORT_WORKERS = 2  # each import is already a long stream of batch writes
+# An import can run for the whole 900s function timeout
+# (terraform/statement_import_lambda.tf); a duplicate event must not retake it sooner
+IMPORT_LOCK_SECONDS = 900 + 60
+
+# Fixed namespace: re-processing the same upload yields the same ids, so an
+# S3 event retry overwrites rows instead of duplicating them
+ID_NAMESPACE = uuid.UUID("5f0b6a36-4c1e-4d0e-9a52-7c1f3e2a9b10")
+
+# Same item shape manual_entry_lambda writes
+def to_item(key, row_number, transaction):
+    amount = transaction["amount"]
+    return {
+        "id": str(uuid.uuid5(ID_NAMESPACE, f"{key}#{row_number}")),
+        "type": "income" if amount > 0 else "expense",
+        "amount": abs(amount),
+        "date": transaction["date"],
+        "category": transaction["category"] or "Imported",
+        "description": transaction["memo"] or transaction["payee"] or "Imported transaction",
+        "vendor": transaction["payee"],
+        "source": "import"
+    }
+
+def lines(body):
+    for line in body.iter_lines(chunk_size=READ_CHUNK):
+        yield line.decode("utf-8-sig", errors="replace")
+
+def import_statement(key, lines, write=record_store.put_records):
+    errors = []
+    chunk = []
+    count = 0
+    for row_number, transaction in statement_parsers.read_statement(key, lines, errors):
+        chunk.append(to_item(key, row_number, transaction))
+        if len(chunk) >= WRITE_CHUNK:
+            write(chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        write(chunk)
+        count += len(chunk)
+    return count, errors
+
+def import_object(bucket, key):
+    # S3 may deliver an event more than once; rows are overwritten by id but
+    # rollup deltas are not, so each uploaded object is imported once
+    obj = runtime.client("s3").get_object(Bucket=bucket, Key=key)
+    import_key = f"import#{bucket}/{key}"
+    stored = idempotency.claim(import_key, obj["ETag"], lock_seconds=IMPORT_LOCK_SECONDS)
+    if stored is not None:
+        print("Already imported:", key)
+        return json.loads(stored["body"])
+
+    try:
+        count, errors = import_statement(key, lines(obj["Body"]))
+    except Exception:
+        idempotency.release(import_key)
+        raise
+    print(json.dumps({"import": key, "records": count, "skipped": len(errors), "errors": errors[:MAX_REPORTED_ERRORS]}))
+
+    result = {"count": count, "skipped": len(errors)}
+    idempotency.complete(import_key, obj["ETag"], {"statusCode": 200, "body": json.dumps(result)})
+    return result
+
+# S3 ObjectCreated on imports/ (see terraform/statement_import_lambda.tf).
+# Stored rows reach OpenSearch through the records stream like any other write.
+# A failed import fails the invocation so S3 retries the event; finished
+# imports answer a retry from their idempotency claim.
+def lambda_handler(event, context):
+    results = s3_events.process_objects(event, import_object, max_workers=IMPORT_WORKERS)
+    s3_events.raise_on_failure(results)
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"message": "Import finished", "results": results})
+    }
+
+# Benchmark: python statement_import_lambda.py [--rows N] [--endpoint-url URL]
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=["csv", "ofx", "qif"], default="csv")
+    parser.add_argument("--endpoint-url")
+    args = parser.parse_args()
+
+    random.seed(7)
+    vendors = ["Walmart", "Amazon", "Dollar Tree", "Payroll", "City Utilities"]
+
+    def synthetic():
+        if args.format == "csv":
+            yield "Date,Description,Amount,Category"
+        elif args.format == "ofx":
+            yield "OFXHEADER:100"
+            yield "<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+        else:
+            yield "!Type:Bank"
+        for i in range(args.rows):
+            date = f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+            amount = f"{random.uniform(-400, 200):.2f}"
+            vendor = random.choice(vendors)
+            if args.format == "csv":
+                yield f"{date},{vendor} #{i},{amount},"
+            elif args.format == "ofx":
+                yield f"<STMTTRN><TRNTYPE>OTHER<DTPOSTED>{date.replace('-', '')}<TRNAMT>{amount}<NAME>{vendor}<MEMO>#{i}</STMTTRN>"
+            else:
+                yield from [f"D{date}", f"T{amount}", f"P{vendor}", f"M#{i}", "^"]
+        if args.format == "ofx":
+            yield "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"
+
+    if args.endpoint_url:
+        import os
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = args.endpoint_url  # picked up when the resource is first built
+        write = record_store.put_records
+    else:
+        write = lambda items: None  # parse + normalise only
+
+    started = time.perf_counter()
+    count, errors = import_statement(f"imports/benchmark.{args.format}", synthetic(), write=write)
+    elapsed = time.perf_counter() - started
+    print(f"format={args.format} rows={count} skipped={len(errors)} elapsed={elapsed:.2f}s ({count / elapsed:,.0f} rows/s)")
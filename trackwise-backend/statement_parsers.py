@@ -0,0 +1,172 @@
+import csv
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+# Streaming parsers for bank statement exports. Each format reader takes an
+# iterator of text lines and yields one dict of raw strings per transaction,
+# so a file of any size is processed with constant memory. read_statement()
+# turns those into {"date": YYYY-MM-DD, "amount": signed Decimal (negative =
+# money out), "payee", "memo", "category"}.
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%d-%b-%Y", "%d %b %Y", "%b %d, %Y", "%Y%m%d")
+
+CSV_DATE_COLUMNS = ("date", "transaction date", "posted date", "posting date", "trans. date")
+CSV_AMOUNT_COLUMNS = ("amount", "transaction amount")
+CSV_DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals", "money out")
+CSV_CREDIT_COLUMNS = ("credit", "deposit", "deposits", "money in")
+CSV_PAYEE_COLUMNS = ("payee", "name", "merchant", "description", "details")
+CSV_MEMO_COLUMNS = ("memo", "notes", "reference")
+CSV_CATEGORY_COLUMNS = ("category",)
+
+_last_format = [DATE_FORMATS[0]]
+
+# A statement uses one date format throughout, so the last format that matched
+# is tried first instead of failing through the whole list on every row
+def parse_date(value):
+    value = value.strip()
+    if len(value) == 10 and value[4] == "-":
+        try:
+            return date.fromisoformat(value).isoformat()
+        except ValueError:
+            pass
+    for date_format in (_last_format[0],) + DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        _last_format[0] = date_format
+        return parsed.strftime("%Y-%m-%d")
+    raise ValueError(f"unrecognised date {value!r}")
+
+def parse_amount(value):
+    value = value.strip().replace("$", "").replace(",", "")
+    negative = value.startswith("(") and value.endswith(")")
+    if negative:
+        value = value[1:-1]
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"unrecognised amount {value!r}")
+    if not amount.is_finite():  # NaN/Infinity parse but cannot be compared or stored
+        raise ValueError(f"unrecognised amount {value!r}")
+    return -amount if negative else amount
+
+def pick(columns, candidates):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+def parse_csv(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    date_col = pick(columns, CSV_DATE_COLUMNS)
+    amount_col = pick(columns, CSV_AMOUNT_COLUMNS)
+    debit_col = pick(columns, CSV_DEBIT_COLUMNS)
+    credit_col = pick(columns, CSV_CREDIT_COLUMNS)
+    payee_col = pick(columns, CSV_PAYEE_COLUMNS)
+    memo_col = pick(columns, CSV_MEMO_COLUMNS)
+    category_col = pick(columns, CSV_CATEGORY_COLUMNS)
+    if date_col is None or (amount_col is None and debit_col is None and credit_col is None):
+        raise ValueError("CSV needs a date column and an amount or debit/credit column")
+
+    def cell(row, index):
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    for row in reader:
+        if not any(row):
+            continue
+        yield {
+            "date": cell(row, date_col),
+            "amount": cell(row, amount_col),
+            "debit": cell(row, debit_col),
+            "credit": cell(row, credit_col),
+            "payee": cell(row, payee_col),
+            "memo": cell(row, memo_col),
+            "category": cell(row, category_col)
+        }
+
+# OFX 1.x is SGML (closing tags optional), 2.x is XML; both reduce to a
+# stream of <TAG>value tokens, whatever the line breaks look like
+def parse_ofx(lines):
+    transaction = None
+    for line in lines:
+        for token in line.split("<")[1:]:
+            tag, _, value = token.partition(">")
+            tag = tag.strip().upper()
+            value = value.strip()
+            if tag == "STMTTRN":
+                transaction = {}
+            elif tag == "/STMTTRN" and transaction is not None:
+                yield {
+                    "date": transaction.get("DTPOSTED", "")[:8],
+                    "amount": transaction.get("TRNAMT", ""),
+                    "payee": transaction.get("NAME", "") or transaction.get("PAYEE", ""),
+                    "memo": transaction.get("MEMO", "")
+                }
+                transaction = None
+            elif transaction is not None and not tag.startswith("/") and value:
+                transaction[tag] = value
+
+def parse_qif(lines):
+    transaction = {}
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if transaction:
+                yield {
+                    "date": transaction.get("D", "").replace("'", "/"),
+                    "amount": transaction.get("T") or transaction.get("U", ""),
+                    "payee": transaction.get("P", ""),
+                    "memo": transaction.get("M", ""),
+                    "category": transaction.get("L", "")
+                }
+            transaction = {}
+        elif code not in transaction:  # keep the first value; split lines (S/E/$) repeat
+            transaction[code] = value
+
+PARSERS = {
+    ".csv": parse_csv,
+    ".ofx": parse_ofx,
+    ".qfx": parse_ofx,
+    ".qif": parse_qif
+}
+
+def parser_for(key):
+    lowered = key.lower()
+    for extension, parser in PARSERS.items():
+        if lowered.endswith(extension):
+            return parser
+    raise ValueError(f"unsupported statement type: {key}")
+
+def to_transaction(raw):
+    if raw.get("amount"):
+        amount = parse_amount(raw["amount"])
+    elif raw.get("debit"):
+        amount = -abs(parse_amount(raw["debit"]))
+    elif raw.get("credit"):
+        amount = abs(parse_amount(raw["credit"]))
+    else:
+        raise ValueError("missing amount")
+    return {
+        "date": parse_date(raw.get("date", "")),
+        "amount": amount,
+        "payee": raw.get("payee", ""),
+        "memo": raw.get("memo", ""),
+        "category": raw.get("category", "")
+    }
+
+# Yields (row_number, transaction); rows that cannot be read are appended to
+# errors as "row N: reason" and skipped rather than failing the whole file
+def read_statement(key, lines, errors):
+    for row_number, raw in enumerate(parser_for(key)(lines), start=1):
+        try:
+            yield row_number, to_transaction(raw)
+        except ValueError as e:
+            errors.append(f"row {row_number}: {e}")
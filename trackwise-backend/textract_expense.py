@@ -0,0 +1,106 @@
+from decimal import Decimal
+from datetime import datetime
+
+# Turns Textract AnalyzeExpense / GetExpenseAnalysis output into a
+# TrackWiseRecords item. Shared by the async completion handler and
+# reparse_bills.py, which replays archived responses.
+
+# Raw responses are archived in the bill bucket under this prefix (outside
+# the bills/ and imports/ notification filters)
+ARCHIVE_PREFIX = "textract/"
+# Shrunk copies of photo uploads that Textract reads instead of the original
+PROCESSED_PREFIX = "processed/"
+
+def safe_decimal(value_str):
+    try:
+        return Decimal(value_str.replace("$", "").replace(",", "").strip())
+    except:
+        return Decimal("0")
+
+# GetExpenseAnalysis pages can split one expense document across responses;
+# parts with the same ExpenseIndex are joined back together
+def merge_documents(documents):
+    merged = {}
+    for doc in documents:
+        index = doc.get("ExpenseIndex", 1)
+        if index not in merged:
+            merged[index] = {"ExpenseIndex": index, "SummaryFields": [], "LineItemGroups": []}
+        merged[index]["SummaryFields"].extend(doc.get("SummaryFields", []))
+        merged[index]["LineItemGroups"].extend(doc.get("LineItemGroups", []))
+    return [merged[index] for index in sorted(merged)]
+
+# The first expense document keeps the upload key as its id (so existing
+# records and the bill hash index keep pointing at it); further receipts in
+# the same scan or PDF bundle get "<key>#<ExpenseIndex>"
+def record_id(document, expense_index):
+    return document if expense_index <= 1 else f"{document}#{expense_index}"
+
+def build_record(record_id, doc):
+    summary = {}
+    for field in doc.get('SummaryFields', []):
+        label = field.get('Type', {}).get('Text')
+        value = field.get('ValueDetection', {}).get('Text')
+        if label and value:
+            summary[label.upper()] = value
+
+    total_candidates = []
+    for key in ["TOTAL", "SUBTOTAL", "AMOUNT_DUE", "BALANCE", "AMOUNT"]:
+        if key in summary:
+            total_candidates.append(safe_decimal(summary[key]))
+
+    if not total_candidates:
+        for val in summary.values():
+            try:
+                total_candidates.append(safe_decimal(val))
+            except:
+                continue
+
+    amount = max(total_candidates) if total_candidates else Decimal("0")
+
+    line_items = []
+    for group in doc.get('LineItemGroups', []):
+        for item in group.get('LineItems', []):
+            fields = {
+                f.get('Type', {}).get('Text'): f.get('ValueDetection', {}).get('Text')
+                for f in item.get('LineItemExpenseFields', [])
+            }
+            line_items.append({
+                "item": fields.get("ITEM", ""),
+                "amount": safe_decimal(fields.get("PRICE", "0")),
+                "category": "Uncategorized"
+            })
+
+    return {
+        "id": record_id,
+        "type": "expense",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "amount": amount,
+        "category": "AutoParsed",
+        "description": summary.get("VENDOR_NAME", "Bill"),
+        "vendor": summary.get("VENDOR_NAME", ""),
+        "line_items": line_items,
+        "source": "textract"
+    }
+
+def processed_key(document):
+    return f"{PROCESSED_PREFIX}{document}"
+
+# Upload key for the object Textract analysed, which may be a processed copy
+def source_document(key):
+    return key[len(PROCESSED_PREFIX):] if key.startswith(PROCESSED_PREFIX) else key
+
+def archive_key(document):
+    return f"{ARCHIVE_PREFIX}{document}.json"
+
+def make_archive(job_id, bucket, document, expense_documents):
+    return {
+        "job_id": job_id,
+        "bucket": bucket,
+        "document": document,
+        "expense_documents": expense_documents
+    }
+
+# One record per expense document in the response
+def records_from_archive(archive):
+    documents = merge_documents(archive["expense_documents"]) or [{"ExpenseIndex": 1}]
+    return [build_record(record_id(archive["document"], doc["ExpenseIndex"]), doc) for doc in documents]
@@ -1,103 +1,94 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import boto3
-from decimal import Decimal
-from datetime import datetime
-import requests
 import os
+import hashlib
+import s3_events
+import bill_index
+import bill_text
+import bill_images
+import record_store
+import textract_expense
+
+runtime.init_complete()
+
+# Both fast paths are optional imports; a missing one silently sends every
+# bill straight to Textract, so say so once per cold start
+if not bill_text.available():
+    print("WARNING: pypdf not available, PDF text layers will not be parsed")
+if not bill_images.available():
+    print("WARNING: Pillow not available, bill images will not be preprocessed")
+
+# Textract publishes job completion here; textract_result_lambda picks it up
+TEXTRACT_TOPIC_ARN = os.environ["TEXTRACT_TOPIC_ARN"]
+TEXTRACT_ROLE_ARN = os.environ["TEXTRACT_ROLE_ARN"]
+# StartExpenseAnalysis has a low per-account TPS quota; more concurrent
+# starts than that only come back throttled
+START_WORKERS = int(os.environ.get("TEXTRACT_START_WORKERS", "2"))
+
+# Digital PDFs carry their own text; parse that locally and only send scans
+# and low-confidence parses to Textract
+def parse_text_layer(bucket, document):
+    if not bill_text.available() or not bill_text.is_pdf(document):
+        return None
+    obj = runtime.client('s3').get_object(Bucket=bucket, Key=document)
+    if obj['ContentLength'] > bill_text.MAX_PDF_BYTES:
+        return None
+    return bill_text.parse_pdf(document, obj['Body'].read())
+
+# Large photos are shrunk into processed/ and Textract reads that copy; the
+# result lambda maps it back to the upload key. Returns the key to analyse.
+def prepare_image(bucket, document):
+    if not bill_images.enabled() or not bill_images.is_image(document):
+        return document
+    s3 = runtime.client('s3')
+    obj = s3.get_object(Bucket=bucket, Key=document)
+    if obj['ContentLength'] < bill_images.MIN_BYTES:
+        return document
+    processed = bill_images.preprocess(obj['Body'].read())
+    if processed is None:
+        return document
+    key = textract_expense.processed_key(document)
+    s3.put_object(Bucket=bucket, Key=key, Body=processed, ContentType="image/jpeg")
+    print("Preprocessed image:", document, obj['ContentLength'], "->", len(processed), "bytes")
+    return key
+
+def start_job(bucket, document):
+    # Identical bytes already uploaded: link to that record and skip Textract
+    content = bill_index.content_hash(bucket, document)
+    owner = bill_index.claim(content, document)
+    if owner != document:
+        print("Duplicate upload:", document, "->", owner)
+        return {"duplicate_of": owner}
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table("TrackWiseRecords")
-
-EMBEDDING_API = os.environ["EMBEDDING_API"]
-AUTH_TOKEN = os.environ["AUTH_TOKEN"]
-
-def safe_decimal(value_str):
-    try:
-        return Decimal(value_str.replace("$", "").replace(",", "").strip())
-    except:
-        return Decimal("0")
-
-def notify_embedding(record):
-    try:
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {AUTH_TOKEN}"
-        }
-        res = requests.post(EMBEDDING_API, json=record, headers=headers)
-        print("Embedding API response:", res.status_code, res.text)
-    except Exception as e:
-        print("Failed to notify embedding service:", str(e))
-
-def lambda_handler(event, context):
     try:
-        bucket = event['Records'][0]['s3']['bucket']['name']
-        document = event['Records'][0]['s3']['object']['key']
-
-        textract = boto3.client('textract')
-        response = textract.analyze_expense(
-            Document={'S3Object': {'Bucket': bucket, 'Name': document}}
+        record = parse_text_layer(bucket, document)
+        if record is not None:
+            record_store.put_records([record])
+            print("Parsed from text layer:", document)
+            return {"parsed": "text_layer"}
+
+        job = runtime.client('textract').start_expense_analysis(
+            DocumentLocation={'S3Object': {'Bucket': bucket, 'Name': prepare_image(bucket, document)}},
+            NotificationChannel={'SNSTopicArn': TEXTRACT_TOPIC_ARN, 'RoleArn': TEXTRACT_ROLE_ARN},
+            # Same object -> same token, so a redelivered S3 event reuses the running job
+            ClientRequestToken=hashlib.sha256(f"{bucket}/{document}".encode("utf-8")).hexdigest()[:64]
         )
-        doc = response['ExpenseDocuments'][0]
-
-        summary = {}
-        for field in doc.get('SummaryFields', []):
-            label = field.get('Type', {}).get('Text')
-            value = field.get('ValueDetection', {}).get('Text')
-            if label and value:
-                summary[label.upper()] = value
-
-        total_candidates = []
-        for key in ["TOTAL", "SUBTOTAL", "AMOUNT_DUE", "BALANCE", "AMOUNT"]:
-            if key in summary:
-                total_candidates.append(safe_decimal(summary[key]))
-
-        if not total_candidates:
-            for val in summary.values():
-                try:
-                    total_candidates.append(safe_decimal(val))
-                except:
-                    continue
-
-        amount = max(total_candidates) if total_candidates else Decimal("0")
-
-        line_items = []
-        for group in doc.get('LineItemGroups', []):
-            for item in group.get('LineItems', []):
-                fields = {
-                    f.get('Type', {}).get('Text'): f.get('ValueDetection', {}).get('Text')
-                    for f in item.get('LineItemExpenseFields', [])
-                }
-                line_items.append({
-                    "item": fields.get("ITEM", ""),
-                    "amount": safe_decimal(fields.get("PRICE", "0")),
-                    "category": "Uncategorized"
-                })
-
-        record = {
-            "id": document,
-            "type": "expense",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "amount": amount,
-            "category": "AutoParsed",
-            "description": summary.get("VENDOR_NAME", "Bill"),
-            "vendor": summary.get("VENDOR_NAME", ""),
-            "line_items": line_items,
-            "source": "textract"
-        }
-
-        table.put_item(Item=record)
-
-        # Notify personal AWS embedding Lambda
-        notify_embedding(record)
-
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"message": "Parsed and stored successfully"})
-        }
-
-    except Exception as e:
-        print("Error:", str(e))
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+    except Exception:
+        # Nothing was stored for this upload, so the hash must not point at it
+        bill_index.forget(content, document)
+        raise
+    print("Started expense analysis:", job['JobId'], document)
+    return {"job_id": job['JobId']}
+
+# Stage 1 of the bill pipeline: start an async expense analysis (handles
+# multi-page PDFs) for every uploaded object and return without waiting on OCR.
+# A failed object fails the invocation so S3's async retry sends the event
+# again; objects already started reuse their job through ClientRequestToken.
+def lambda_handler(event, context):
+    results = s3_events.process_objects(event, start_job, max_workers=START_WORKERS)
+    s3_events.raise_on_failure(results)
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"message": "Expense analysis started", "results": results})
+    }
@@ -0,0 +1,73 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+import json
+import record_store
+import textract_expense
+import bill_index
+
+runtime.init_complete()
+
+PAGE_SIZE = 20  # GetExpenseAnalysis MaxResults upper bound
+
+def get_documents(job_id):
+    textract = runtime.client('textract')
+    documents = []
+    kwargs = {'JobId': job_id, 'MaxResults': PAGE_SIZE}
+    while True:
+        response = textract.get_expense_analysis(**kwargs)
+        if response['JobStatus'] != 'SUCCEEDED':
+            raise Exception(f"Job {job_id} is {response['JobStatus']}: {response.get('StatusMessage', '')}")
+        documents.extend(response.get('ExpenseDocuments', []))
+        if not response.get('NextToken'):
+            return documents
+        kwargs['NextToken'] = response['NextToken']
+
+# Stage 2 of the bill pipeline: Textract's SNS completion notice -> page
+# through the results -> store one record per expense document
+def lambda_handler(event, context):
+    try:
+        message = json.loads(event['Records'][0]['Sns']['Message'])
+        job_id = message['JobId']
+        document = textract_expense.source_document(message['DocumentLocation']['S3ObjectName'])
+        bucket = message['DocumentLocation']['S3Bucket']
+
+        if message['Status'] != 'SUCCEEDED':
+            print("Expense analysis did not succeed:", job_id, message['Status'], document)
+            bill_index.forget(bill_index.content_hash(bucket, document), document)
+            return {
+                "statusCode": 200,
+                "body": json.dumps({"message": f"Job {message['Status']}"})
+            }
+
+        content = bill_index.content_hash(bucket, document)
+        try:
+            # Keep the raw response so parser changes can be replayed without paying for OCR again
+            archive = textract_expense.make_archive(job_id, bucket, document, get_documents(job_id))
+            runtime.client('s3').put_object(
+                Bucket=bucket,
+                Key=textract_expense.archive_key(document),
+                Body=json.dumps(archive).encode("utf-8"),
+                ContentType="application/json"
+            )
+            records = textract_expense.records_from_archive(archive)
+
+            # One batched write for every receipt in the upload; the records
+            # stream then embeds them together
+            record_store.put_records(records)
+        except Exception:
+            # No record behind this upload yet; later uploads of the same bytes must not link to it
+            bill_index.forget(content, document)
+            raise
+        # A failed earlier delivery of this notice may have forgotten the hash
+        bill_index.claim(content, document)
+
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"message": "Parsed and stored successfully", "count": len(records)})
+        }
+
+    except Exception as e:
+        # SNS invokes this asynchronously: a returned error counts as success,
+        # so raise to get Lambda's async retries
+        print("Error:", str(e))
+        raise
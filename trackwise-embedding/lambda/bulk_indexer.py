@@ -0,0 +1,185 @@
+import json
+import time
+import random
+import logging
+import http_client
+
+# OpenSearch _bulk indexing for batches of documents. Actions are packed into
+# NDJSON requests capped by doc count and bytes; the per-item results are
+# parsed and only items that failed with a retryable status are sent again.
+
+logger = logging.getLogger()
+
+MAX_DOCS = 500
+MAX_BYTES = 5 * 1024 * 1024  # well under the 10MB request limit on small domains
+MAX_ATTEMPTS = 4
+BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def bulk_url(doc_url):
+    # ".../transactions/_doc" -> ".../transactions/_bulk"
+    return doc_url.rsplit("/_doc", 1)[0] + "/_bulk"
+
+def opensearch_bulk():
+    # Index and delete actions are keyed by id, so a resent request is safe
+    return http_client.client("opensearch-bulk", timeout=(3.05, 60), retry_post=True)
+
+# One (id, NDJSON bytes) pair per action
+def encode_actions(docs, deletes):
+    actions = []
+    for doc in docs:
+        line = json.dumps({"index": {"_id": doc["id"]}}) + "\n" + json.dumps(doc) + "\n"
+        actions.append((doc["id"], line.encode("utf-8")))
+    for record_id in deletes:
+        actions.append((record_id, (json.dumps({"delete": {"_id": record_id}}) + "\n").encode("utf-8")))
+    return actions
+
+def batches(actions, max_docs=MAX_DOCS, max_bytes=MAX_BYTES):
+    batch, size = [], 0
+    for action in actions:
+        if batch and (len(batch) >= max_docs or size + len(action[1]) > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(action)
+        size += len(action[1])
+    if batch:
+        yield batch
+
+# Returns (retryable, failed) actions of one _bulk request
+def send(client, url, auth, batch):
+    response = client.post(
+        url,
+        auth=auth,
+        headers={"Content-Type": "application/x-ndjson"},
+        data=b"".join(line for _, line in batch)
+    )
+    if response.status_code in RETRY_STATUSES:
+        return batch, []
+    if not response.ok:
+        return [], [(record_id, response.status_code, response.text[:200]) for record_id, _ in batch]
+
+    result = response.json()
+    if not result.get("errors"):
+        return [], []
+    retryable, failed = [], []
+    # Items come back in request order, one per action
+    for action, item in zip(batch, result["items"]):
+        op, outcome = next(iter(item.items()))
+        status = outcome.get("status", 500)
+        if status < 300 or (op == "delete" and status == 404):
+            continue
+        if status in RETRY_STATUSES:
+            retryable.append(action)
+        else:
+            failed.append((action[0], status, json.dumps(outcome.get("error"))[:200]))
+    return retryable, failed
+
+# Indexes docs and deletes ids; returns counts plus the items that still
+# failed (permanent errors, or retryable ones past MAX_ATTEMPTS)
+def bulk(url, docs, deletes=(), auth=None, client=None, max_docs=MAX_DOCS, max_bytes=MAX_BYTES):
+    client = client or opensearch_bulk()
+    pending = encode_actions(docs, deletes)
+    failed, requests_sent = [], 0
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            logger.warning("🔁 Retrying %d bulk items (attempt %d)", len(pending), attempt + 1)
+            time.sleep(random.uniform(0, BACKOFF * 2 ** (attempt - 1)))
+        retry = []
+        for batch in batches(pending, max_docs, max_bytes):
+            retryable, permanent = send(client, url, auth, batch)
+            requests_sent += 1
+            retry.extend(retryable)
+            failed.extend(permanent)
+        if not retry:
+            break
+        pending = retry
+    else:
+        failed.extend((record_id, 429, "retries exhausted") for record_id, _ in pending)
+
+    return {
+        "actions": len(docs) + len(deletes),
+        "requests": requests_sent,
+        "failed": [{"id": record_id, "status": status, "error": error} for record_id, status, error in failed]
+    }
+
+# Local comparison of one PUT per document vs _bulk, against a stub that
+# speaks enough of the OpenSearch API and rejects a share of items with 429:
+#
+#   python bulk_indexer.py --docs 5000 --reject 0.02
+if __name__ == "__main__":
+    import argparse
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--reject", type=float, default=0.02, help="share of bulk items answered with 429")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds added per request, as a network round trip")
+    args = parser.parse_args()
+
+    stored = {}
+
+    class Stub(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = -1  # headers and body in one send, or Nagle adds ~40ms per request
+
+        def log_message(self, *_):
+            pass
+
+        def reply(self, status, body):
+            time.sleep(args.latency)
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            self.wfile.flush()
+
+        def do_PUT(self):
+            doc = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            stored[self.path.rsplit("/", 1)[1]] = doc
+            self.reply(201, {"result": "created"})
+
+        def do_POST(self):
+            lines = self.rfile.read(int(self.headers["Content-Length"])).splitlines()
+            items, errors, i = [], False, 0
+            while i < len(lines):
+                op, meta = next(iter(json.loads(lines[i]).items()))
+                if random.random() < args.reject:
+                    items.append({op: {"_id": meta["_id"], "status": 429, "error": {"type": "es_rejected_execution_exception"}}})
+                    errors = True
+                elif op == "index":
+                    stored[meta["_id"]] = json.loads(lines[i + 1])
+                    items.append({op: {"_id": meta["_id"], "status": 201}})
+                else:
+                    found = stored.pop(meta["_id"], None) is not None
+                    items.append({op: {"_id": meta["_id"], "status": 200 if found else 404}})
+                i += 2 if op == "index" else 1
+            self.reply(200, {"took": 1, "errors": errors, "items": items})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    doc_url = f"http://127.0.0.1:{server.server_port}/transactions/_doc"
+
+    docs = [
+        {"id": f"bench-{i}", "text": f"On 2025-01-01, you spent ${i} at Vendor {i}.", "embedding": [random.random() for _ in range(args.dim)]}
+        for i in range(args.docs)
+    ]
+
+    single = http_client.client("bench-single")
+    started = time.perf_counter()
+    for doc in docs:
+        single.put(f"{doc_url}/{doc['id']}", headers={"Content-Type": "application/json"}, data=json.dumps(doc)).raise_for_status()
+    per_doc = time.perf_counter() - started
+
+    stored.clear()
+    started = time.perf_counter()
+    result = bulk(bulk_url(doc_url), docs, client=http_client.client("bench-bulk", retry_post=True))
+    bulk_seconds = time.perf_counter() - started
+
+    print(f"{args.docs} docs x {args.dim} dims")
+    print(f"  per-doc PUT: {per_doc:.2f}s, {args.docs} requests")
+    print(f"  _bulk:       {bulk_seconds:.2f}s, {result['requests']} requests, {len(result['failed'])} failed, {len(stored)} stored")
+    server.shutdown()
@@ -1,11 +1,17 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import boto3
-import requests
 import logging
+import http_client
+import text_log
+import bulk_indexer
+from concurrent.futures import ThreadPoolExecutor
 from requests_aws4auth import AWS4Auth
 from datetime import datetime
 import os
 
+runtime.init_complete()
+
 EXPECTED_TOKEN = os.environ["AUTH_TOKEN"]
 
 
@@ -16,20 +22,131 @@ logger.setLevel(logging.INFO)
 region = "us-east-1"
 service = "es"
 bucket_name = "trackwise-vector-cache"
-s3_key = "texts.json"
 opensearch_url = "https://search-transaction-vectore-store-3sxh5zsi2y7pzl5a3ytfb2unri.us-east-1.es.amazonaws.com/transactions/_doc"
+EMBED_WORKERS = 8  # concurrent Bedrock calls per batch
+
+# AWS clients are built on first use and reused by the warm container
+def opensearch_auth():
+    def build():
+        credentials = runtime.session().get_credentials()
+        return AWS4Auth(
+            credentials.access_key,
+            credentials.secret_key,
+            region,
+            service,
+            session_token=credentials.token
+        )
+    return runtime.cached("opensearch_auth", build)
+
+def opensearch():
+    return http_client.client("opensearch", timeout=(3.05, 10))
+
+def build_document(body):
+    record_id = body["id"]
+    amount = float(body["amount"])
+    date = body["date"]
+    vendor = body.get("vendor", "Unknown Vendor")
+    category = body.get("category", "Uncategorized")
+    description = body.get("description", "")
+    type_ = body["type"]  # "income" or "expense"
+    timestamp = datetime.strptime(date, "%Y-%m-%d").isoformat()
+
+    # Line items summary
+    line_items = body.get("line_items", [])
+    item_list = [f"{item.get('item', '')} (${item.get('amount', 0)})" for item in line_items]
+    items_summary = ", ".join(item_list)
+
+    # Human-style natural summary text
+    if type_.lower() == "income":
+        text = (
+            f"On {date}, you received an income of ${amount} from {vendor}, categorized as {category}."
+            f" Description: {description}."
+        )
+    else:
+        if items_summary:
+            text = (
+                f"On {date}, you spent ${amount} at {vendor} on items such as {items_summary}, categorized under {category}."
+                f" Description: {description}."
+            )
+        else:
+            text = (
+                f"On {date}, you made a payment of ${amount} at {vendor}, categorized under {category}."
+                f" Description: {description}."
+            )
 
-# AWS Clients
-bedrock = boto3.client("bedrock-runtime", region_name=region)
-s3 = boto3.client("s3")
-credentials = boto3.Session().get_credentials()
-auth = AWS4Auth(
-    credentials.access_key,
-    credentials.secret_key,
-    region,
-    service,
-    session_token=credentials.token
-)
+    logger.info("🧠 Final constructed text: %s", text)
+
+    # Step 1: Generate Titan embedding
+    bedrock_response = runtime.client("bedrock-runtime", region_name=region).invoke_model(
+        body=json.dumps({"inputText": text}),
+        modelId="amazon.titan-embed-text-v2:0",
+        accept="application/json",
+        contentType="application/json"
+    )
+    embedding = json.loads(bedrock_response["body"].read())["embedding"]
+    logger.info("📐 Embedding vector length: %d", len(embedding))
+
+    # Step 2: Store in OpenSearch
+    doc = {
+        "id": record_id,
+        "text": text,
+        "embedding": embedding,
+        "amount": amount,
+        "date": date,
+        "timestamp": timestamp,
+        "vendor": vendor,
+        "category": category,
+        "type": type_,
+        "line_items_raw": items_summary
+    }
+
+    return doc
+
+# Documents are keyed by record id, so re-indexing a modified record replaces it
+def index_document(doc):
+    logger.info("📦 Document to be indexed in OpenSearch: %s", json.dumps(doc))
+
+    os_response = opensearch().put(
+        f"{opensearch_url}/{doc['id']}",
+        auth=opensearch_auth(),
+        headers={"Content-Type": "application/json"},
+        data=json.dumps(doc)
+    )
+
+    logger.info("🔍 OpenSearch status code: %d", os_response.status_code)
+    logger.info("🔎 OpenSearch response: %s", os_response.text)
+
+    if not os_response.ok:
+        raise Exception(f"Failed to index to OpenSearch: {os_response.text}")
+
+# A record that cannot be turned into a document (a console-written item with
+# no date or amount) fails the same way on every retry, so it is skipped and
+# reported instead of failing the batch; Bedrock errors still raise
+def try_build_document(record):
+    try:
+        return build_document(record), None
+    except (KeyError, ValueError, TypeError, AttributeError) as e:
+        return None, {"id": record.get("id") if isinstance(record, dict) else None, "error": f"{type(e).__name__}: {e}"}
+
+# Batches embed concurrently and go to OpenSearch through _bulk instead of a
+# signed request per document; only items that failed are resent. Returns the
+# indexed docs and the items that failed permanently.
+def index_batch(records, deletes):
+    with ThreadPoolExecutor(EMBED_WORKERS) as pool:
+        built = list(pool.map(try_build_document, records))
+    docs = [doc for doc, _ in built if doc is not None]
+    failed = [error for _, error in built if error is not None]
+
+    result = bulk_indexer.bulk(bulk_indexer.bulk_url(opensearch_url), docs, deletes, auth=opensearch_auth())
+    logger.info("📦 Bulk indexed %d actions in %d requests", result["actions"], result["requests"])
+
+    # Throttling that outlasted the retries is worth another try from the caller
+    transient = [item for item in result["failed"] if item["status"] in bulk_indexer.RETRY_STATUSES]
+    if transient:
+        raise Exception(f"Failed to index {len(transient)} items: {json.dumps(transient[:5])}")
+    rejected = {item["id"] for item in result["failed"]}
+    failed.extend(result["failed"])
+    return [doc for doc in docs if doc["id"] not in rejected], [record_id for record_id in deletes if record_id not in rejected], failed
 
 def lambda_handler(event, context):
     try:
@@ -44,100 +161,31 @@ def lambda_handler(event, context):
             }
 
         body = json.loads(event["body"])
-        record_id = body["id"]
-        amount = float(body["amount"])
-        date = body["date"]
-        vendor = body.get("vendor", "Unknown Vendor")
-        category = body.get("category", "Uncategorized")
-        description = body.get("description", "")
-        type_ = body["type"]  # "income" or "expense"
-        timestamp = datetime.strptime(date, "%Y-%m-%d").isoformat()
-
-        # Line items summary
-        line_items = body.get("line_items", [])
-        item_list = [f"{item.get('item', '')} (${item.get('amount', 0)})" for item in line_items]
-        items_summary = ", ".join(item_list)
-
-        # Human-style natural summary text
-        if type_.lower() == "income":
-            text = (
-                f"On {date}, you received an income of ${amount} from {vendor}, categorized as {category}."
-                f" Description: {description}."
-            )
-        else:
-            if items_summary:
-                text = (
-                    f"On {date}, you spent ${amount} at {vendor} on items such as {items_summary}, categorized under {category}."
-                    f" Description: {description}."
-                )
-            else:
-                text = (
-                    f"On {date}, you made a payment of ${amount} at {vendor}, categorized under {category}."
-                    f" Description: {description}."
-                )
-
-        logger.info("🧠 Final constructed text: %s", text)
-
-        # Step 1: Generate Titan embedding
-        bedrock_response = bedrock.invoke_model(
-            body=json.dumps({"inputText": text}),
-            modelId="amazon.titan-embed-text-v2:0",
-            accept="application/json",
-            contentType="application/json"
-        )
-        embedding = json.loads(bedrock_response["body"].read())["embedding"]
-        logger.info("📐 Embedding vector length: %d", len(embedding))
-
-        # Step 2: Store in OpenSearch
-        doc = {
-            "id": record_id,
-            "text": text,
-            "embedding": embedding,
-            "amount": amount,
-            "date": date,
-            "timestamp": timestamp,
-            "vendor": vendor,
-            "category": category,
-            "type": type_,
-            "line_items_raw": items_summary
-        }
-
-        logger.info("📦 Document to be indexed in OpenSearch: %s", json.dumps(doc))
-
-        os_response = requests.post(
-            opensearch_url,
-            auth=auth,
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(doc)
-        )
-
-        logger.info("🔍 OpenSearch status code: %d", os_response.status_code)
-        logger.info("🔎 OpenSearch response: %s", os_response.text)
 
-        if not os_response.ok:
-            raise Exception(f"Failed to index to OpenSearch: {os_response.text}")
-
-        # Step 3: Append to S3 texts.json
-        try:
-            obj = s3.get_object(Bucket=bucket_name, Key=s3_key)
-            texts = json.loads(obj['Body'].read())
-        except s3.exceptions.NoSuchKey:
-            texts = []
-
-        texts.append(doc)
-
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=s3_key,
-            Body=json.dumps(texts),
-            ContentType="application/json"
-        )
-
-        logger.info("✅ Successfully updated texts.json in S3.")
+        # Batch requests carry {"records": [...], "deletes": [ids]}; single records are posted as-is
+        if "records" in body or "deletes" in body:
+            docs, deletes, failed = index_batch(body.get("records", []), body.get("deletes", []))
+        else:
+            docs, deletes, failed = [build_document(body)], [], []
+            index_document(docs[0])
+
+        # Step 3: Append this batch to the text log; text_log_compactor merges it later
+        segment = text_log.append(bucket_name, docs, deletes)
+        logger.info("✅ Appended %s to the text log.", segment)
+        http_client.log_stats()
+
+        # Everything else is indexed; 422 tells the caller these items will
+        # fail the same way again, so it should report them rather than retry
+        if failed:
+            logger.warning("⚠️ Skipped %d items: %s", len(failed), json.dumps(failed[:20]))
+            return {
+                "statusCode": 422,
+                "body": json.dumps({"error": f"{len(failed)} items could not be indexed", "failed": failed})
+            }
 
         return {
             "statusCode": 200,
-            "body": json.dumps({"message": "✅ Indexed and updated texts.json successfully."})
+            "body": json.dumps({"message": "✅ Indexed and appended to the text log successfully."})
         }
 
     except Exception as e:
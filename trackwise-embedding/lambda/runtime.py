@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+
+# --- Import-time profiling ---
+# Handler modules import this first, call profile_imports() and then
+# init_complete() after their own imports, so every cold start logs one line
+# with the per-module import cost. Library modules and CLIs only import this
+# for the clients and never install the hook. Set IMPORT_PROFILE=0 on a
+# function to turn it off.
+
+_init_started = None
+_original_import = builtins.__import__
+_import_stack = []
+_import_times = {}
+
+def _profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and not fromlist and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    module = name
+    if level and globals and globals.get("__package__"):
+        base = globals["__package__"].rsplit(".", level - 1)[0]
+        module = f"{base}.{name}" if name else base
+
+    # Re-entrant imports of a module already loading (e.g. "from requests import x"
+    # inside requests itself) must not count its time twice
+    outermost = all(entry[0] != module for entry in _import_stack)
+    _import_stack.append([module, 0.0])
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = _import_stack.pop()[1]
+        if _import_stack:
+            _import_stack[-1][1] += elapsed
+        totals = _import_times.setdefault(module, [0.0, 0.0])
+        if outermost:
+            totals[0] += elapsed
+        totals[1] += elapsed - children
+
+def profile_imports():
+    global _init_started
+    if os.environ.get("IMPORT_PROFILE", "1") == "0" or builtins.__import__ is _profiled_import:
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    _init_started = time.perf_counter()
+    builtins.__import__ = _profiled_import
+
+def init_complete(top=15):
+    if builtins.__import__ is not _profiled_import:
+        return
+    builtins.__import__ = _original_import
+
+    slowest = sorted(_import_times.items(), key=lambda entry: entry[1][0], reverse=True)[:top]
+    print(json.dumps({
+        "metric": "init_imports",
+        "function": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", os.path.basename(sys.argv[0])),
+        "init_ms": round((time.perf_counter() - _init_started) * 1000, 2),
+        "modules": [
+            {"module": module, "cumulative_ms": round(total * 1000, 2), "self_ms": round(own * 1000, 2)}
+            for module, (total, own) in slowest
+        ]
+    }))
+
+# --- Lazily built AWS clients, cached for the life of the warm container ---
+
+_clients = {}
+_clients_lock = threading.RLock()
+
+def cached(key, build):
+    if key not in _clients:
+        with _clients_lock:
+            if key not in _clients:
+                _clients[key] = build()
+    return _clients[key]
+
+def client(service_name, **kwargs):
+    def build():
+        import boto3
+        return boto3.client(service_name, **kwargs)
+    return cached(("client", service_name, tuple(sorted(kwargs.items()))), build)
+
+def resource(service_name, **kwargs):
+    def build():
+        import boto3
+        return boto3.resource(service_name, **kwargs)
+    return cached(("resource", service_name, tuple(sorted(kwargs.items()))), build)
+
+def session():
+    def build():
+        import boto3
+        return boto3.Session()
+    return cached(("session",), build)
+
+def table(name):
+    return cached(("table", name), lambda: resource("dynamodb").Table(name))
@@ -1,22 +1,27 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
 import json
-import boto3
-import requests
+import http_client
 from requests_aws4auth import AWS4Auth
 import os
 
+runtime.init_complete()
+
 region = "us-east-1"
 service = "es"
 
-# AWS clients
-bedrock = boto3.client("bedrock-runtime", region_name=region)
-credentials = boto3.Session().get_credentials()
-auth = AWS4Auth(
-    credentials.access_key,
-    credentials.secret_key,
-    region,
-    service,
-    session_token=credentials.token
-)
+# AWS clients are built on first use and reused by the warm container
+def opensearch_auth():
+    def build():
+        credentials = runtime.session().get_credentials()
+        return AWS4Auth(
+            credentials.access_key,
+            credentials.secret_key,
+            region,
+            service,
+            session_token=credentials.token
+        )
+    return runtime.cached("opensearch_auth", build)
 
 # Constants
 OPENSEARCH_URL = os.environ["OPENSEARCH_URL"]
@@ -62,6 +67,7 @@ def lambda_handler(event, context):
             return {"statusCode": 400, "body": json.dumps({"error": "Missing 'query'"})}
 
         # Step 1: Embed user query
+        bedrock = runtime.client("bedrock-runtime", region_name=region)
         embed_resp = bedrock.invoke_model(
             body=json.dumps({"inputText": query}),
             modelId="amazon.titan-embed-text-v2:0",
@@ -83,9 +89,11 @@ def lambda_handler(event, context):
             }
         }
 
-        search_resp = requests.post(
-            opensearch_url,
-            auth=auth,
+        # A k-NN search is read-only, so a retried POST is safe
+        opensearch = http_client.client("opensearch", timeout=(3.05, 10), retry_post=True)
+        search_resp = opensearch.post(
+            OPENSEARCH_URL,
+            auth=opensearch_auth(),
             headers={"Content-Type": "application/json"},
             json=search_query
         )
@@ -117,6 +125,7 @@ def lambda_handler(event, context):
         )
 
         final_answer = json.loads(claude_resp["body"].read())["completion"]
+        http_client.log_stats()
 
         return {
             "statusCode": 200,
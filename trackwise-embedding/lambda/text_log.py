@@ -0,0 +1,201 @@
+import json
+import time
+import uuid
+import logging
+from botocore.exceptions import ClientError
+import runtime
+
+# Append-only log of indexed documents in the vector cache bucket, replacing
+# the single texts.json that every invocation downloaded, edited and uploaded.
+#
+#   texts/segments/<ns>-<uuid>.json   one small immutable object per batch
+#   texts/compacted/<ns>-<uuid>.json  larger segments written by the compactor
+#   texts/manifest.json               compacted segments in order, plus the
+#                                     segments they already contain
+#
+# Writers only ever create new keys, so an append is one PUT whatever the log
+# size and concurrent appends cannot overwrite each other. Every segment is
+# {"docs": [...], "deletes": [ids]}, plus "stamps": {id: ns} once compacted.
+# Each change is stamped with the time in the key of the segment it arrived
+# in, and the newest stamp wins per id whichever order segments are merged
+# in: a slow writer's segment can land after a compaction already folded in
+# newer ones. Deletes are tombstones until a full merge finds them older
+# than any segment still in flight.
+
+logger = logging.getLogger()
+
+SEGMENT_PREFIX = "texts/segments/"
+COMPACTED_PREFIX = "texts/compacted/"
+MANIFEST_KEY = "texts/manifest.json"
+LEGACY_KEY = "texts.json"  # pre-log snapshot, folded in by the first compaction
+
+MAX_COMPACTED = 8  # more compacted segments than this are merged into one
+RETIRE_SECONDS = 15 * 60  # merged objects outlive the manifest that dropped them, for in-flight readers
+
+def new_key(prefix):
+    # Nanosecond prefix keeps listings in append order
+    return f"{prefix}{time.time_ns():020d}-{uuid.uuid4().hex}.json"
+
+# Write time of a segment's changes; the legacy snapshot predates them all
+def key_stamp(key):
+    stamp = key.rsplit("/", 1)[-1].split("-", 1)[0]
+    return int(stamp) if stamp.isdigit() else 0
+
+def append(bucket, docs, deletes=()):
+    if not docs and not deletes:
+        return None
+    key = new_key(SEGMENT_PREFIX)
+    runtime.client("s3").put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps({"docs": docs, "deletes": list(deletes)}),
+        ContentType="application/json",
+        IfNoneMatch="*"
+    )
+    return key
+
+def read_segment(bucket, key):
+    body = json.loads(runtime.client("s3").get_object(Bucket=bucket, Key=key)["Body"].read())
+    if isinstance(body, list):  # legacy texts.json
+        return {"docs": body, "deletes": []}
+    return body
+
+# (manifest, etag); etag is None until the first compaction has written one
+def read_manifest(bucket):
+    s3 = runtime.client("s3")
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=MANIFEST_KEY)
+        return json.loads(obj["Body"].read()), obj["ETag"]
+    except s3.exceptions.NoSuchKey:
+        pass
+    try:
+        s3.head_object(Bucket=bucket, Key=LEGACY_KEY)
+        compacted = [LEGACY_KEY]
+    except ClientError:
+        compacted = []
+    return {"compacted": compacted, "merged": [], "retired": []}, None
+
+def segment_keys(bucket):
+    paginator = runtime.client("s3").get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=SEGMENT_PREFIX):
+        for obj in page.get("Contents", []):
+            yield obj["Key"]
+
+# Applies (key, segment) pairs keeping the newest change per id: id -> doc,
+# ids whose newest change is a delete, and id -> stamp of that change
+def merge(segments):
+    docs, tombstones, stamps = {}, set(), {}
+
+    def newer(record_id, stamp):
+        if stamp < stamps.get(record_id, -1):
+            return False
+        stamps[record_id] = stamp
+        return True
+
+    for key, segment in segments:
+        default = key_stamp(key)
+        segment_stamps = segment.get("stamps", {})
+        for record_id in segment.get("deletes", []):
+            if newer(record_id, segment_stamps.get(record_id, default)):
+                docs.pop(record_id, None)
+                tombstones.add(record_id)
+        for doc in segment.get("docs", []):
+            if newer(doc["id"], segment_stamps.get(doc["id"], default)):
+                docs.pop(doc["id"], None)  # re-insert so an update moves to the end
+                docs[doc["id"]] = doc
+                tombstones.discard(doc["id"])
+    return docs, tombstones, stamps
+
+def pending_keys(bucket, manifest):
+    merged = set(manifest["merged"])
+    return [key for key in segment_keys(bucket) if key not in merged]
+
+# Current documents: compacted segments, then segments not merged yet
+def load(bucket, attempts=3):
+    for attempt in range(attempts):
+        manifest, _ = read_manifest(bucket)
+        try:
+            keys = manifest["compacted"] + pending_keys(bucket, manifest)
+            docs, _, _ = merge((key, read_segment(bucket, key)) for key in keys)
+            return list(docs.values())
+        except runtime.client("s3").exceptions.NoSuchKey:
+            # A compaction retired something this manifest still listed
+            if attempt == attempts - 1:
+                raise
+    return []
+
+def write_compacted(bucket, docs, tombstones, stamps):
+    key = new_key(COMPACTED_PREFIX)
+    runtime.client("s3").put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps({
+            "docs": list(docs.values()),
+            "deletes": sorted(tombstones),
+            "stamps": {record_id: stamps[record_id] for record_id in list(docs) + sorted(tombstones)}
+        }),
+        ContentType="application/json"
+    )
+    return key
+
+# Merges pending segments into one compacted segment, or everything into a
+# single segment once there would be more than MAX_COMPACTED. The manifest is
+# swapped with a conditional PUT, so a concurrent compaction loses cleanly
+# instead of dropping segments; replaced objects are deleted RETIRE_SECONDS
+# after the manifest that stopped using them.
+def compact(bucket):
+    s3 = runtime.client("s3")
+    manifest, etag = read_manifest(bucket)
+    now = time.time()
+
+    pending = pending_keys(bucket, manifest)
+    compacted = list(manifest["compacted"])
+    written, retiring = None, []
+    if pending and len(compacted) >= MAX_COMPACTED:
+        # Nothing older remains except segments still being written, so only
+        # tombstones recent enough to meet one of those are kept
+        docs, tombstones, stamps = merge((key, read_segment(bucket, key)) for key in compacted + pending)
+        horizon = (now - RETIRE_SECONDS) * 1e9
+        written = write_compacted(bucket, docs, {record_id for record_id in tombstones if stamps[record_id] > horizon}, stamps)
+        retiring = compacted + pending
+        compacted = [written]
+    elif pending:
+        docs, tombstones, stamps = merge((key, read_segment(bucket, key)) for key in pending)
+        written = write_compacted(bucket, docs, tombstones, stamps)
+        retiring = pending
+        compacted.append(written)
+
+    expired = {entry["key"] for entry in manifest["retired"] if entry["at"] <= now - RETIRE_SECONDS}
+    if written is None and not expired:
+        return {"pending": 0, "compacted": len(compacted), "deleted": 0}
+
+    # Nothing the current manifest reads is expired (merged segments are
+    # skipped by key), so these can go before the swap; if the swap then
+    # loses, the winner's manifest only skips keys that no longer exist
+    for key in expired:
+        s3.delete_object(Bucket=bucket, Key=key)
+
+    new_manifest = {
+        "compacted": compacted,
+        "merged": [key for key in manifest["merged"] if key not in expired] + pending,
+        "retired": [entry for entry in manifest["retired"] if entry["key"] not in expired]
+                   + [{"key": key, "at": now} for key in retiring]
+    }
+    conditions = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=MANIFEST_KEY,
+            Body=json.dumps(new_manifest),
+            ContentType="application/json",
+            **conditions
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in ("PreconditionFailed", "ConditionalRequestConflict"):
+            raise
+        logger.warning("Manifest changed during compaction; discarding %s", written)
+        if written:
+            s3.delete_object(Bucket=bucket, Key=written)
+        return {"conflict": True}
+
+    return {"pending": len(pending), "compacted": len(compacted), "deleted": len(expired)}
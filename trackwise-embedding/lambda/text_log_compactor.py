@@ -0,0 +1,19 @@
+import runtime  # first import, so INIT import costs are profiled
+runtime.profile_imports()
+import json
+import logging
+import text_log
+
+runtime.init_complete()
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+bucket_name = "trackwise-vector-cache"
+
+# Runs on a schedule: folds the small segments index_embedder appends into
+# compacted segments and advances texts/manifest.json
+def lambda_handler(event, context):
+    result = text_log.compact(bucket_name)
+    logger.info("🗜️ Compaction: %s", json.dumps(result))
+    return result
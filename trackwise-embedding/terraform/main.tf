@@ -46,10 +46,14 @@ resource "aws_iam_role_policy" "lambda_policy" {
       {
         Action = [
           "s3:GetObject",
-          "s3:PutObject"
+          "s3:PutObject",
+          "s3:DeleteObject"
         ],
         Effect = "Allow",
-        Resource = "arn:aws:s3:::trackwise-vector-cache/texts.json"
+        Resource = [
+          "arn:aws:s3:::trackwise-vector-cache/texts.json",
+          "arn:aws:s3:::trackwise-vector-cache/texts/*"
+        ]
       },
       {
         Action = ["s3:ListBucket"],
@@ -138,6 +142,39 @@ resource "aws_lambda_permission" "allow_semantic_api" {
   source_arn    = "${aws_apigatewayv2_api.embedding_api.execution_arn}/*/*"
 }
 
+# Merges the text log segments index_embedder appends (see text_log.py)
+resource "aws_lambda_function" "text_log_compactor" {
+  function_name    = "TrackwiseTextLogCompactor"
+  filename         = "../lambda/text_log_compactor.zip"
+  source_code_hash = filebase64sha256("../lambda/text_log_compactor.zip")
+  handler          = "text_log_compactor.lambda_handler"
+  runtime          = "python3.11"
+  role             = aws_iam_role.lambda_exec_role.arn
+  timeout          = 300
+  memory_size      = 1024
+
+  # The manifest swap is conditional anyway; one runner avoids wasted merges
+  reserved_concurrent_executions = 1
+}
+
+resource "aws_cloudwatch_event_rule" "text_log_compaction" {
+  name                = "trackwise-text-log-compaction"
+  schedule_expression = "rate(15 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "text_log_compaction" {
+  rule = aws_cloudwatch_event_rule.text_log_compaction.name
+  arn  = aws_lambda_function.text_log_compactor.arn
+}
+
+resource "aws_lambda_permission" "allow_compaction_schedule" {
+  statement_id  = "AllowCompactionSchedule"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.text_log_compactor.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.text_log_compaction.arn
+}
+
 resource "aws_s3_bucket" "vector_cache" {
   bucket = "trackwise-vector-cache"
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import DatePicker from 'react-datepicker';
 import 'react-datepicker/dist/react-datepicker.css';
 import 'react-toastify/dist/ReactToastify.css';
@@ -15,6 +15,8 @@ function AddEntry() {
   const [error, setError] = useState('');
   const [uploading, setUploading] = useState(false);
   const [billFile, setBillFile] = useState(null);
+  // Kept until the server answers, so a resubmit after a network failure cannot create a duplicate
+  const idempotencyKey = useRef(crypto.randomUUID());
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -36,11 +38,15 @@ function AddEntry() {
     try {
       const response = await fetch(`${import.meta.env.VITE_API_BASE_URL}/manual-entry`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": idempotencyKey.current
+        },
         body: JSON.stringify(payload)
       });
 
       const result = await response.json();
+      idempotencyKey.current = crypto.randomUUID();
       if (response.ok) {
         toast.success("Entry submitted successfully!");
         setAmount('');
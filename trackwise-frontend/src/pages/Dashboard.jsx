@@ -1,19 +1,48 @@
 import React, { useEffect, useState } from 'react';
 import { ArrowDownCircle, ArrowUpCircle } from 'lucide-react';
 
+const EXPORT_POLL_MS = 2000;
+const EXPORT_POLL_ATTEMPTS = 450; // 15 minutes, the export function's timeout
+
 function Dashboard() {
   const [records, setRecords] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [filter, setFilter] = useState('all');
   const [search, setSearch] = useState('');
+  const [summary, setSummary] = useState({ income: 0, expense: 0, net: 0 });
 
   useEffect(() => {
-    const fetchRecords = async () => {
+    const fetchSummary = async () => {
       try {
-        const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/get-transactions`);
+        const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/get-summary`);
         const data = await res.json();
-        setRecords(data);
+        if (!res.ok) throw new Error(data.error || `HTTP ${res.status}`);
+        setSummary(data);
+      } catch (err) {
+        console.error('Error fetching summary:', err);
+      }
+    };
+    fetchSummary();
+  }, []);
+
+  useEffect(() => {
+    const fetchRecords = async () => {
+      try {
+        const all = [];
+        let cursor = null;
+        do {
+          const params = new URLSearchParams({
+            limit: '500',
+            fields: 'date,type,amount,category,source,vendor',
+          });
+          if (cursor) params.set('cursor', cursor);
+          const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/get-transactions?${params}`);
+          const data = await res.json();
+          all.push(...data.items);
+          setRecords([...all]);
+          cursor = data.next_cursor;
+        } while (cursor);
       } catch (err) {
         console.error('Error fetching records:', err);
         setError('Failed to fetch data.');
@@ -31,29 +60,38 @@ function Dashboard() {
     );
   });
 
-  const income = records
-    .filter((r) => r.type === 'income')
-    .reduce((sum, r) => sum + parseFloat(r.amount), 0);
-
-  const expense = records
-    .filter((r) => r.type === 'expense')
-    .reduce((sum, r) => sum + parseFloat(r.amount), 0);
+  const { income, expense, net } = summary;
 
-  const net = income - expense;
+  const downloadCSV = async () => {
+    try {
+      const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/export-transactions`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ format: 'csv' }),
+      });
+      const job = await res.json();
+      if (!res.ok) throw new Error(job.error || `HTTP ${res.status}`);
 
-  const downloadCSV = () => {
-    const csvContent = [
-      ['Date', 'Type', 'Amount', 'Category', 'Source', 'Vendor'],
-      ...records.map((r) => [r.date, r.type, r.amount, r.category, r.source, r.vendor || '-']),
-    ]
-      .map((row) => row.join(','))
-      .join('\n');
-    const blob = new Blob([csvContent], { type: 'text/csv' });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    link.href = url;
-    link.download = 'trackwise_transactions.csv';
-    link.click();
+      // The export runs in the background; poll until the file is ready
+      let status = job;
+      for (let attempt = 0; status.status !== 'DONE'; attempt++) {
+        if (status.status === 'FAILED' || attempt >= EXPORT_POLL_ATTEMPTS) {
+          throw new Error(status.error || 'Export did not finish');
+        }
+        await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_MS));
+        const poll = await fetch(`${import.meta.env.VITE_API_BASE_URL}/export-transactions/${job.job_id}`);
+        status = await poll.json();
+        if (!poll.ok) throw new Error(status.error || `HTTP ${poll.status}`);
+      }
+      const { url } = status;
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = 'trackwise_transactions.csv';
+      link.click();
+    } catch (err) {
+      console.error('Error exporting records:', err);
+      setError('Failed to export data.');
+    }
   };
 
   return (